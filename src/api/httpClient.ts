@@ -33,6 +33,8 @@ export interface RequestConfig {
   retryDelay?: number;
   /** AbortController 信号 */
   signal?: AbortSignal;
+  /** 已序列化的 JSON 请求体；提供时直接发送，不再对 body 重复 JSON.stringify */
+  serializedBody?: string;
 }
 
 /** API 响应包装 */
@@ -99,6 +101,16 @@ class HttpClient {
     return headers;
   }
 
+  /**
+   * 序列化请求体（调用方已序列化时直接复用）
+   */
+  private serializeBody(body: any, config?: RequestConfig): string | undefined {
+    if (config?.serializedBody !== undefined) {
+      return config.serializedBody;
+    }
+    return body ? JSON.stringify(body) : undefined;
+  }
+
   /**
    * 处理响应错误
    */
@@ -368,7 +380,7 @@ class HttpClient {
     const options: RequestInit = {
       method: 'POST',
       headers,
-      body: body ? JSON.stringify(body) : undefined,
+      body: this.serializeBody(body, config),
     };
 
     let response = await this.fetchWithRetry(url, options, config);
@@ -396,7 +408,7 @@ class HttpClient {
     const options: RequestInit = {
       method: 'POST',
       headers,
-      body: body ? JSON.stringify(body) : undefined,
+      body: this.serializeBody(body, config),
     };
 
     let response = await this.fetchWithRetry(url, options, config);
@@ -420,7 +432,7 @@ class HttpClient {
     const options: RequestInit = {
       method: 'PUT',
       headers,
-      body: body ? JSON.stringify(body) : undefined,
+      body: this.serializeBody(body, config),
     };
 
     let response = await this.fetchWithRetry(url, options, config);
@@ -530,8 +542,6 @@ export async function fetchWithAuth(
   url: string,
   options: RequestInit = {}
 ): Promise<Response> {
-  const { getAuthHeaders } = await import('../config/apiConfig');
-
   // Add auth headers
   const headers = {
     ...getAuthHeaders(),
@@ -326,7 +326,9 @@ class MetricModelApiService {
       );
     }
 
-    const cacheKey = `batch|${modelIds.join(',')}|${JSON.stringify(requests)}|${JSON.stringify(options ?? {})}`;
+    // 请求体只序列化一次，同时用于缓存键和 API 调用
+    const requestsJson = JSON.stringify(requests);
+    const cacheKey = `batch|${modelIds.join(',')}|${requestsJson}|${JSON.stringify(options ?? {})}`;
     const cached = _getFromBatchCache(cacheKey);
     if (cached) {
       if (import.meta.env.DEV) {
@@ -337,7 +339,7 @@ class MetricModelApiService {
 
     const ids = modelIds.join(',');
     const url = `${this.baseUrl}/metric-models/${ids}${this.buildQueryParams(options)}`;
-    const promise = httpClient.postAsGet<MetricQueryResult[]>(url, requests, { timeout: options?.timeout })
+    const promise = httpClient.postAsGet<MetricQueryResult[]>(url, requests, { timeout: options?.timeout, serializedBody: requestsJson })
       .then(r => r.data)
       .catch(err => {
         _apiBatchCache.delete(cacheKey);
@@ -21,6 +21,7 @@ import type {
   EdgeType,
   ObjectType,
   QueryObjectInstancesOptions,
+  ObjectInstance,
   ObjectInstancesResponse,
   QueryObjectPropertyValuesOptions,
   ObjectPropertyValuesResponse,
@@ -336,6 +337,55 @@ class OntologyApiClient {
     return normalizedResponse;
   }
 
+  /**
+   * Query all object instances by following search_after across pages
+   * @param objectTypeId Object type ID
+   * @param options Query options; limit is the requested page size (the server may cap it lower)
+   * @param maxPages Safety cap on the number of pages fetched
+   * @returns Concatenated entries of all pages
+   *
+   * 翻页必须串行（下一页依赖上一页返回的 search_after），但拿到游标后立即发起
+   * 下一页请求，再处理当前页数据，使结果合并与下一页的网络往返重叠。
+   */
+  async queryAllObjectInstances(
+    objectTypeId: string,
+    options?: QueryObjectInstancesOptions,
+    maxPages: number = 100
+  ): Promise<ObjectInstancesResponse> {
+    const allEntries: ObjectInstance[] = [];
+    const firstPage = await this.queryObjectInstances(objectTypeId, options);
+    let page = firstPage;
+
+    for (let pageCount = 1; ; pageCount++) {
+      // 服务端可能把单页条数限制在 limit 以下，因此不能用“本页不足 limit 条”
+      // 判断结束；只要游标非空且本页有数据就继续翻页
+      const cursor = page.search_after;
+      const hasMore = !!cursor && cursor.length > 0 && page.entries.length > 0;
+
+      if (hasMore && pageCount >= maxPages) {
+        console.warn(`[OntologyAPI] ${objectTypeId} 分页达到上限 ${maxPages} 页，结果可能不完整`);
+      }
+
+      // 先发起下一页请求，再合并当前页
+      const nextPage = hasMore && pageCount < maxPages
+        ? this.queryObjectInstances(objectTypeId, { ...options, search_after: cursor, need_total: false })
+        : null;
+
+      for (const entry of page.entries) {
+        allEntries.push(entry);
+      }
+
+      if (!nextPage) break;
+      page = await nextPage;
+    }
+
+    return {
+      entries: allEntries,
+      total_count: options?.need_total ? firstPage.total_count : allEntries.length,
+      object_type: firstPage.object_type,
+    };
+  }
+
   /**
    * Query specific property values for object instances using ADP Ontology Query API
    * @param objectTypeId Object type ID (e.g., 'product')
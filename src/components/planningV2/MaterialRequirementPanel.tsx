@@ -177,27 +177,33 @@ const MaterialRequirementPanel = ({ active, step1Data, onConfirm, onBack }: Mate
       const altPartMap = new Map<string, string[]>();
       let subsNameMap = new Map<string, string>();
 
+      // 替代组号只在同一父件下唯一，分组键需包含父件编码，否则不同父件的同号组会被合并
       const groupMap = new Map<string, BOMRecord[]>();
       allBomWithSubs.forEach(bom => {
         if (bom.alt_method === '替代' && bom.alt_group_no) {
-          const list = groupMap.get(bom.alt_group_no) ?? [];
+          const groupKey = `${bom.parent_material_code}|${bom.alt_group_no}`;
+          const list = groupMap.get(groupKey) ?? [];
           list.push(bom);
-          groupMap.set(bom.alt_group_no, list);
+          groupMap.set(groupKey, list);
         }
       });
+      const altPartSets = new Map<string, Set<string>>();
       groupMap.forEach(members => {
         const mains = members.filter(m => (m.alt_priority ?? 0) === 0);
         const subs = members.filter(m => (m.alt_priority ?? 0) > 0);
         if (mains.length > 0 && subs.length > 0) {
           mains.forEach(main => {
-            const subCodes = subs.map(s => s.material_code);
-            const existing = altPartMap.get(main.material_code) ?? [];
-            subCodes.forEach(sc => { if (!existing.includes(sc)) existing.push(sc); });
-            altPartMap.set(main.material_code, existing);
+            let existing = altPartSets.get(main.material_code);
+            if (!existing) {
+              existing = new Set<string>();
+              altPartSets.set(main.material_code, existing);
+            }
+            subs.forEach(s => existing!.add(s.material_code));
           });
           subs.forEach(s => { subsNameMap.set(s.material_code, s.material_name); });
         }
       });
+      altPartSets.forEach((subCodes, mainCode) => altPartMap.set(mainCode, [...subCodes]));
       console.log(`[MRP Panel] BOM: 用量映射 ${bomUsageMap.size}, 替代料组 ${groupMap.size}, 有替代料的主料 ${altPartMap.size} 个`);
 
       // 3. 加载替代料库存
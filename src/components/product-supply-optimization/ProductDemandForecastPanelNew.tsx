@@ -6,6 +6,7 @@ import {
   simpleExponentialSmoothing,
   holtLinearSmoothing,
   holtWintersSmoothing,
+  oneStepBacktest,
   type SmoothingParams,
   type ProphetParams,
 } from '../../services/forecastAlgorithmService';
@@ -174,44 +175,26 @@ export const ProductDemandForecastPanelNew: React.FC<Props> = ({ productId, prod
       const FORECAST_MONTHS = 12; // 未来预测12个月（含本月）
 
       // 为每个月生成回测值（从第3个月开始，因为需要至少2个数据点）
+      // 前2个月没有足够数据进行回测，使用实际值；其余为使用前i个月数据对第i+1个月的预测
+      // Prophet 回测与 Holt-Winters 一致（Holt-Winters 内部会根据数据量自动回退）
+      const backtestAlgorithm = algorithm === 'prophet' ? 'holt_winters' : algorithm;
+      const rawBacktest = oneStepBacktest(history, backtestAlgorithm, smoothingParams, 2);
+      let trainingSum = 0;
       for (let i = 0; i < history.length; i++) {
         if (i < 2) {
-          // 前2个月没有足够数据进行回测，使用实际值
           backtestValues.push(history[i].quantity);
         } else {
-          // 使用前i个月的数据预测第i+1个月
-          const trainingData = history.slice(0, i);
-          let predicted: number;
-
-          switch (algorithm) {
-            case 'prophet':
-            case 'holt_winters': {
-              // Holt-Winters 内部会根据数据量自动回退
-              const hwResult = holtWintersSmoothing(trainingData, 1, smoothingParams);
-              predicted = hwResult[0];
-              break;
-            }
-            case 'holt_linear': {
-              const holtResult = holtLinearSmoothing(trainingData, 1, smoothingParams);
-              predicted = holtResult[0];
-              break;
-            }
-            case 'simple_exponential':
-            default: {
-              const simpleResult = simpleExponentialSmoothing(trainingData, 1, smoothingParams);
-              predicted = simpleResult[0];
-              break;
-            }
-          }
+          let predicted = rawBacktest[i];
 
           // Ensure predicted value is valid (not NaN or Infinity)
-          if (!isFinite(predicted) || isNaN(predicted)) {
+          if (!Number.isFinite(predicted)) {
             console.warn(`[DemandForecast] Invalid predicted value at index ${i}: ${predicted}, using training data average instead`);
-            predicted = trainingData.reduce((sum, d) => sum + d.quantity, 0) / trainingData.length;
+            predicted = trainingSum / i;
           }
 
           backtestValues.push(Math.round(Math.max(0, predicted)));
         }
+        trainingSum += history[i].quantity;
       }
 
       console.log(`[DemandForecast] Backtest values (first 5):`, backtestValues.slice(0, 5));
@@ -236,6 +219,8 @@ export const ProductDemandForecastPanelNew: React.FC<Props> = ({ productId, prod
               intervalWidth: params?.intervalWidth || 0.95,
               growth: params?.growth || 'linear',
             },
+            // 回测误差在本地计算，无需服务端样本内指标
+            compute_metrics: false,
           };
           const prophetResult = await forecastOperatorService.forecast('prophet', prophetInput);
           console.log(`[DemandForecast] Prophet result:`, prophetResult);
@@ -290,25 +275,64 @@ export const ProductDemandForecastPanelNew: React.FC<Props> = ({ productId, prod
       const comparisonData: ForecastComparisonData[] = [];
 
       // 添加历史数据（过去12个月）：包含真实值和回测值，无已确认订单
-      history.forEach((h, idx) => {
+      // 同时在同一次遍历中累计实际值与回测MAPE (Mean Absolute Percentage Error)
+      let totalActual = 0;
+      let mapeSum = 0;
+      let mapeCount = 0;
+      const topErrors: Array<{ month: string; actual: number; predicted: number; error: number }> = [];
+
+      for (let idx = 0; idx < history.length; idx++) {
+        const h = history[idx];
+        const actual = h.quantity;
+        const predicted = backtestValues[idx];
+        totalActual += actual;
+
         comparisonData.push({
           month: formatMonth(h.month),
-          actual: h.quantity,
-          backtest: backtestValues[idx],
+          actual,
+          backtest: predicted,
           forecast: null,
           confirmedOrder: null,  // 历史月份无已确认订单
           consensusDemand: null, // 历史月份无共识需求
           isHistorical: true,
         });
-      });
+
+        // 前2个月为训练起点，不参与回测误差
+        if (idx >= 2 && actual > 0) {
+          const error = Math.abs((actual - predicted) / actual);
+          mapeSum += error;
+          mapeCount++;
+
+          // 只保留误差最大的3个月（同误差按月份先后）
+          const entry = { month: h.month, actual, predicted, error: Math.round(error * 1000) / 10 };
+          let pos = topErrors.length;
+          while (pos > 0 && topErrors[pos - 1].error < entry.error) pos--;
+          if (pos < 3) {
+            topErrors.splice(pos, 0, entry);
+            if (topErrors.length > 3) topErrors.pop();
+          }
+        }
+      }
 
       // 添加预测数据（未来12个月含本月）：回测曲线延续为预测曲线
-      // 同时添加已确认订单和共识需求
-      for (let i = 0; i < FORECAST_MONTHS; i++) {
-        const futureMonth = addMonths(lastMonth, i + 1);
-        const forecastValue = Math.round(Math.max(0, futureForecasts[i]));
+      // 同时添加已确认订单和共识需求，并在同一次遍历中累计预测统计。
+      // 统计覆盖算法实际返回的全部预测值（可能多于或少于 12 个），图表只取前 12 个月
+      const forecastCount = futureForecasts.length;
+      let totalForecast = 0;
+      let totalConsensusDemand = 0;
+      for (let i = 0; i < Math.max(FORECAST_MONTHS, forecastCount); i++) {
+        const futureMonth = futureMonthsRaw[i];
+        const rawForecast = futureForecasts[i];
         const confirmedOrderValue = confirmedOrdersMap[futureMonth] || 0;
 
+        if (i < forecastCount) {
+          totalForecast += rawForecast;
+          totalConsensusDemand += rawForecast * 0.6 + confirmedOrderValue * 0.4;
+        }
+        if (i >= FORECAST_MONTHS) continue;
+
+        const forecastValue = Math.round(Math.max(0, rawForecast));
+
         // 共识需求 = AI预测 × 60% + 已确认订单 × 40%
         const consensusDemandValue = Math.round(forecastValue * 0.6 + confirmedOrderValue * 0.4);
 
@@ -337,47 +361,15 @@ export const ProductDemandForecastPanelNew: React.FC<Props> = ({ productId, prod
       setForecastData(comparisonData);
 
       // 计算统计数据
-      const actualValues = history.map(h => h.quantity);
-      const avgActual = actualValues.reduce((a, b) => a + b, 0) / actualValues.length;
-      const avgForecast = futureForecasts.reduce((a, b) => a + b, 0) / futureForecasts.length;
-      const totalForecast = futureForecasts.reduce((a, b) => a + b, 0);
+      const avgActual = totalActual / history.length;
+      const avgForecast = totalForecast / forecastCount;
 
       // 计算已确认订单和共识需求统计
       const confirmedOrderValues = Object.values(confirmedOrdersMap);
       const totalConfirmedOrders = confirmedOrderValues.reduce((a, b) => a + b, 0);
 
-      // 共识需求 = AI预测 × 60% + 已确认订单 × 40%
-      const consensusDemandValues = futureForecasts.map((f, i) => {
-        const confirmedOrder = confirmedOrdersMap[futureMonthsRaw[i]] || 0;
-        return f * 0.6 + confirmedOrder * 0.4;
-      });
-      const avgConsensusDemand = consensusDemandValues.reduce((a, b) => a + b, 0) / consensusDemandValues.length;
-
-      // 计算回测MAPE (Mean Absolute Percentage Error)
-      let mapeSum = 0;
-      let mapeCount = 0;
-      const mapeErrors: Array<{ month: string; actual: number; predicted: number; error: number }> = [];
-
-      for (let i = 2; i < history.length; i++) {
-        const actual = history[i].quantity;
-        const predicted = backtestValues[i];
-        if (actual > 0) {
-          const error = Math.abs((actual - predicted) / actual);
-          mapeSum += error;
-          mapeCount++;
-          mapeErrors.push({
-            month: history[i].month,
-            actual,
-            predicted,
-            error: Math.round(error * 1000) / 10, // percentage
-          });
-        }
-      }
-
-      // Find months with highest errors
-      const topErrors = mapeErrors
-        .sort((a, b) => b.error - a.error)
-        .slice(0, 3);
+      // 共识需求 = AI预测 × 60% + 已确认订单 × 40%（已在预测数据遍历中累计）
+      const avgConsensusDemand = totalConsensusDemand / forecastCount;
 
       const backtestMAPE = mapeCount > 0 ? (mapeSum / mapeCount) * 100 : 0;
       console.log(`[DemandForecast] MAPE calculation: totalError=${Math.round(mapeSum * 100) / 100}, count=${mapeCount}, MAPE=${Math.round(backtestMAPE * 10) / 10}%`);
@@ -6,6 +6,25 @@
 
 import type { BOMData, BOMTree, MaterialRequirement, EnhancedMaterialRequirement, SubstitutionRelation } from '../types/stagnantInventory';
 
+/**
+ * 按父件编码索引 BOM 行（含替代料行，保持原始顺序）
+ *
+ * @param bomData BOM 数据数组
+ * @returns 父件编码 -> 子件 BOM 行列表
+ */
+function buildChildIndex(bomData: BOMData[]): Map<string, BOMData[]> {
+    const index = new Map<string, BOMData[]>();
+    for (const row of bomData) {
+        const rows = index.get(row.parentCode);
+        if (rows) {
+            rows.push(row);
+        } else {
+            index.set(row.parentCode, [row]);
+        }
+    }
+    return index;
+}
+
 /**
  * 递归展开 BOM 到最底层物料
  * 
@@ -22,18 +41,28 @@ export function expandBOM(
     currentQuantity: number = 1,
     level: number = 0,
     visited: Set<string> = new Set()
+): BOMTree {
+    // 先按父件编码建立一次索引，避免每个节点都扫描全部 BOM 行
+    return expandBOMNode(productCode, buildChildIndex(bomData), currentQuantity, level, visited);
+}
+
+function expandBOMNode(
+    productCode: string,
+    childIndex: Map<string, BOMData[]>,
+    currentQuantity: number,
+    level: number,
+    visited: Set<string>
 ): BOMTree {
     // 防止循环引用
     if (visited.has(productCode)) {
         throw new Error(`检测到循环引用: ${productCode}`);
     }
 
-    // 添加到已访问集合
-    const newVisited = new Set(visited);
-    newVisited.add(productCode);
+    // 加入当前路径（所有层共享同一个集合，展开完子节点后移除，避免每条边复制一次）
+    visited.add(productCode);
 
     // 查找当前产品的所有子物料
-    const children = bomData.filter(row => row.parentCode === productCode);
+    const children = childIndex.get(productCode) || [];
 
     // 构建树节点
     const tree: BOMTree = {
@@ -55,12 +84,12 @@ export function expandBOM(
         const childQuantity = currentQuantity * child.childQuantity;
 
         try {
-            const childTree = expandBOM(
+            const childTree = expandBOMNode(
                 child.childCode,
-                bomData,
+                childIndex,
                 childQuantity,
                 level + 1,
-                newVisited
+                visited
             );
 
             tree.children.push(childTree);
@@ -70,6 +99,7 @@ export function expandBOM(
         }
     }
 
+    visited.delete(productCode);
     return tree;
 }
 
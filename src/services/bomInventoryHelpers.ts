@@ -44,15 +44,57 @@ async function parallelChunks<TChunk, TResult>(
     fn: (chunk: TChunk[]) => Promise<TResult[]>,
     concurrency = CHUNK_CONCURRENCY
 ): Promise<TResult[]> {
+    // 滑动窗口：任一分片完成即补发下一个，避免整批等待最慢的请求
+    const chunkResults: TResult[][] = new Array(chunks.length);
+    let nextIndex = 0;
+    let failed = false;
+    const worker = async () => {
+        while (!failed && nextIndex < chunks.length) {
+            const index = nextIndex++;
+            try {
+                chunkResults[index] = await fn(chunks[index]);
+            } catch (e) {
+                failed = true;
+                throw e;
+            }
+        }
+    };
+    const workerCount = Math.min(concurrency, chunks.length);
+    const workers: Promise<void>[] = [];
+    for (let w = 0; w < workerCount; w++) workers.push(worker());
+    await Promise.all(workers);
+
+    // 按分片顺序合并结果
     const results: TResult[] = [];
-    for (let i = 0; i < chunks.length; i += concurrency) {
-        const batch = chunks.slice(i, i + concurrency);
-        const batchResults = await Promise.all(batch.map(fn));
-        for (const r of batchResults) results.push(...r);
-    }
+    for (const r of chunkResults) results.push(...r);
     return results;
 }
 
+// ============================================================================
+// BOM 记录缓存（与 planningV2DataService 的 TTL 缓存 + in-flight 去重一致）
+// ============================================================================
+
+interface CacheEntry<T> {
+    data: T;
+    timestamp: number;
+}
+
+/** 一次 BOM 主料记录查询的结果及各步骤耗时 */
+interface BOMRecordsResult {
+    records: any[] | null;
+    timings: Record<string, number>;
+}
+
+/**
+ * 最新版本 BOM 主料记录缓存，键为 `${bomTypeId}:${bomFilterValue}`；null 表示该产品无 BOM。
+ * 不提供手动清除：BOM 数据变更后最多 BOM_CACHE_TTL 内仍返回旧记录，刷新页面即可立即重新查询。
+ */
+const bomRecordsCache = new Map<string, CacheEntry<any[] | null>>();
+const BOM_CACHE_TTL = 5 * 60 * 1000; // 5 分钟
+
+/** In-Flight 去重：同一产品的并发加载共享同一次查询，各调用方拿到各自的结果副本 */
+const pendingBomRecords = new Map<string, Promise<BOMRecordsResult>>();
+
 // ============================================================================
 // 产品列表
 // ============================================================================
@@ -103,7 +145,7 @@ export async function loadProductList() {
 function buildTreeFromFlatRecords(productCode: string, records: any[]): BOMNode {
     if (records.length > 0) {
         console.log('[BOM服务] BOM 记录字段:', Object.keys(records[0]));
-        console.log('[BOM服务] 前2条记录示例:', JSON.stringify(records.slice(0, 2), null, 2));
+        console.log('[BOM服务] 前2条记录示例:', records.slice(0, 2));
     }
 
     // 构建 childMap: parent_code -> 子件记录列表
@@ -115,81 +157,108 @@ function buildTreeFromFlatRecords(productCode: string, records: any[]): BOMNode
         childMap[parentCode].push(r);
     }
 
-    // 按 material_code 建索引，用于读取库存/单价等附加字段
-    const recordByCode = new Map<string, any>();
-    for (const r of records) {
-        const code = String(r.material_code || r.child_code || '').trim();
-        if (code && !recordByCode.has(code)) recordByCode.set(code, r);
+    // 迭代式后序 DFS：显式栈代替递归，路径上的节点共用一个 visited 集合（入栈 add、出栈 delete），
+    // 避免深层 BOM 递归过深以及每个子件复制一次 visited
+    interface ChildDescriptor {
+        code: string;
+        name: string;
+        quantity: number;
+    }
+
+    interface BuildFrame {
+        code: string;
+        name: string;
+        level: number;
+        parentCode: string | null;
+        quantity: number;
+        childList: ChildDescriptor[];
+        next: number;
+        children: BOMNode[];
     }
 
-    function buildNode(
-        code: string,
-        name: string,
-        level: number,
-        parentCode: string | null,
-        quantity: number,
-        visited: Set<string>
-    ): BOMNode {
-        if (visited.has(code)) {
-            console.warn(`[BOM服务] 循环引用，跳过: ${code}`);
-            return makeEmptyNode(code, name, level, parentCode, quantity);
+    // 共用子装配件在树中会多次出现，子件字段解析结果按父件编码缓存，每个父件只解析一次
+    const childDescriptorCache = new Map<string, ChildDescriptor[]>();
+    const getChildDescriptors = (code: string): ChildDescriptor[] => {
+        let descriptors = childDescriptorCache.get(code);
+        if (descriptors) return descriptors;
+        descriptors = [];
+        for (const child of childMap[code] || []) {
+            const childCode = String(child.material_code || child.child_code || '').trim();
+            if (!childCode) continue;
+            descriptors.push({
+                code: childCode,
+                name: String(child.material_name || child.child_name || '').trim(),
+                quantity: parseFloat(String(child.standard_usage || child.child_quantity || '1')) || 1,
+            });
         }
+        childDescriptorCache.set(code, descriptors);
+        return descriptors;
+    };
+
+    const visited = new Set<string>();
+    const openFrame = (code: string, name: string, level: number, parentCode: string | null, quantity: number): BuildFrame => {
         visited.add(code);
+        return { code, name, level, parentCode, quantity, childList: getChildDescriptors(code), next: 0, children: [] };
+    };
 
-        const childRecords = childMap[code] || [];
-        const children = childRecords
-            .map((child: any) => {
-                const childCode = String(child.material_code || child.child_code || '').trim();
-                const childName = String(child.material_name || child.child_name || '').trim();
-                const childQty = parseFloat(String(child.standard_usage || child.child_quantity || '1')) || 1;
-                return buildNode(childCode, childName, level + 1, code, childQty, new Set(visited));
-            })
-            .filter((c: BOMNode) => c.code);
+    const stack: BuildFrame[] = [openFrame(productCode, productCode, 0, null, 1)];
+    let root: BOMNode | null = null;
 
-        visited.delete(code);
+    while (stack.length > 0) {
+        const frame = stack[stack.length - 1];
 
-        // 库存和单价在 enrichNodes 阶段填充，这里初始化为 0
-        let stockStatus: StockStatus = 'unknown';
+        if (frame.next < frame.childList.length) {
+            const child = frame.childList[frame.next++];
 
-        return {
-            id: crypto.randomUUID(),
-            code, name: name || code,
-            level, quantity, unit: '个',
-            isLeaf: children.length === 0,
-            parentCode, children,
-            currentStock: 0, availableStock: 0,
-            stockStatus, storageDays: 0, unitPrice: 0,
-            isSubstitute: false, alternativeGroup: null, primaryMaterialCode: null, substitutes: []
-        };
+            if (visited.has(child.code)) {
+                console.warn(`[BOM服务] 循环引用，跳过: ${child.code}`);
+                frame.children.push(makeNode(child.code, child.name, frame.level + 1, frame.code, child.quantity));
+                continue;
+            }
+            stack.push(openFrame(child.code, child.name, frame.level + 1, frame.code, child.quantity));
+            continue;
+        }
+
+        // 所有子件已构建完成，出栈并组装当前节点
+        stack.pop();
+        visited.delete(frame.code);
+
+        const node = makeNode(frame.code, frame.name, frame.level, frame.parentCode, frame.quantity, frame.children);
+
+        if (stack.length > 0) {
+            stack[stack.length - 1].children.push(node);
+        } else {
+            root = node;
+        }
     }
 
-    return buildNode(productCode, productCode, 0, null, 1, new Set());
+    return root!;
 }
 
-function makeEmptyNode(code: string, name: string, level: number, parentCode: string | null, quantity: number): BOMNode {
+/** 节点 id 用模块内自增序号生成，会话内唯一即可，避免每个节点都调用 crypto.randomUUID */
+let nodeIdSeq = 0;
+
+/**
+ * 创建 BOM 节点（所有节点共用同一构造，保持对象结构一致）
+ * 库存和单价在 enrichNodes 阶段填充，这里初始化为 0
+ */
+function makeNode(
+    code: string,
+    name: string,
+    level: number,
+    parentCode: string | null,
+    quantity: number,
+    children: BOMNode[] = []
+): BOMNode {
     return {
-        id: crypto.randomUUID(), code, name: name || code,
-        level, quantity, unit: '个', isLeaf: true, parentCode,
-        children: [], currentStock: 0, availableStock: 0,
+        id: `bom-node-${++nodeIdSeq}`, code, name: name || code,
+        level, quantity, unit: '个', isLeaf: children.length === 0, parentCode,
+        children, currentStock: 0, availableStock: 0,
         stockStatus: 'unknown' as StockStatus, storageDays: 0, unitPrice: 0,
         isSubstitute: false, alternativeGroup: null, primaryMaterialCode: null, substitutes: []
     };
 }
 
-/** 统计树的汇总数据 */
-function calcTreeStats(node: BOMNode, stats: { totalValue: number; stagnantCount: number; insufficientCount: number }) {
-    if (node.level > 0) {
-        if (node.stockStatus === 'stagnant') stats.stagnantCount++;
-        if (node.stockStatus === 'insufficient') stats.insufficientCount++;
-        stats.totalValue += node.currentStock * node.unitPrice;
-    }
-    for (const child of node.children) calcTreeStats(child, stats);
-}
-
-function countNodes(node: BOMNode): number {
-    return 1 + node.children.reduce((sum, c) => sum + countNodes(c), 0);
-}
-
 /** 收集 BOM 树中所有子件物料编码（跳过根节点） */
 function collectMaterialCodes(node: BOMNode): string[] {
     const codes = new Set<string>();
@@ -212,6 +281,46 @@ interface InventoryEntry {
     unitPrice: number;   // 库存对象中的单价（ERP 系统通常在库存记录里携带标准成本）
 }
 
+interface InventoryRecord extends InventoryEntry {
+    code: string;
+}
+
+/**
+ * 将一条库存对象实例转换为数值化的库存记录，无物料编码时返回 null
+ *
+ * @param now 本次查询统一的当前时间戳
+ * @param storageDaysByInbound 入库日期 -> 库龄天数缓存，同一批次的多条库存记录只解析一次日期
+ */
+function parseInventoryRecord(
+    r: any,
+    now: number,
+    storageDaysByInbound: Map<any, number>
+): InventoryRecord | null {
+    const code = String(r.material_code || '').trim();
+    if (!code) return null;
+
+    const currentStock   = Number(r.inventory_qty          ?? r.inventory_data    ?? r.current_stock ?? 0);
+    const availableStock = Number(r.available_inventory_qty ?? r.available_quantity ?? currentStock);
+    let storageDays: number;
+    if (r.inbound_date) {
+        const cached = storageDaysByInbound.get(r.inbound_date);
+        if (cached !== undefined) {
+            storageDays = cached;
+        } else {
+            storageDays = Math.floor((now - new Date(r.inbound_date).getTime()) / 86_400_000);
+            storageDaysByInbound.set(r.inbound_date, storageDays);
+        }
+    } else {
+        storageDays = Number(r.inventory_age ?? r.storage_days ?? 0);
+    }
+    const unitPrice = Number(
+        r.unit_price ?? r.unit_cost ?? r.standard_cost ??
+        r.standard_price ?? r.move_price ?? r.price ?? 0
+    );
+
+    return { code, currentStock, availableStock, storageDays, unitPrice };
+}
+
 async function fetchInventoryMap(
     materialCodes: string[]
 ): Promise<Map<string, InventoryEntry>> {
@@ -223,6 +332,9 @@ async function fetchInventoryMap(
         const chunks = chunkArray(materialCodes, BATCH_CHUNK_SIZE);
         console.log(`[BOM服务] 查询库存: ${typeId}，物料数: ${materialCodes.length}，分 ${chunks.length} 批(并发${CHUNK_CONCURRENCY})`);
 
+        // 每批返回后立即解析为数值记录，解析与其余批次的网络请求重叠，也不再保留原始记录数组
+        const now = Date.now();
+        const storageDaysByInbound = new Map<any, number>();
         const allRecords = await parallelChunks(chunks, async (chunk) => {
             const response = await ontologyApi.queryObjectInstances(typeId, {
                 condition: {
@@ -232,35 +344,33 @@ async function fetchInventoryMap(
                 limit: 5000,
                 need_total: false,
             });
-            return response.entries || (response as any).datas || [];
+            const entries: any[] = response.entries || (response as any).datas || [];
+            const parsed: InventoryRecord[] = [];
+            for (const r of entries) {
+                const record = parseInventoryRecord(r, now, storageDaysByInbound);
+                if (record) parsed.push(record);
+            }
+            return parsed;
         });
 
-        for (const r of allRecords) {
-            const code = String(r.material_code || '').trim();
-            if (!code) continue;
-
-            const currentStock   = Number(r.inventory_qty          ?? r.inventory_data    ?? r.current_stock ?? 0);
-            const availableStock = Number(r.available_inventory_qty ?? r.available_quantity ?? currentStock);
-            const storageDays    = r.inbound_date
-                ? Math.floor((Date.now() - new Date(r.inbound_date).getTime()) / 86_400_000)
-                : Number(r.inventory_age ?? r.storage_days ?? 0);
-            const unitPrice = Number(
-                r.unit_price ?? r.unit_cost ?? r.standard_cost ??
-                r.standard_price ?? r.move_price ?? r.price ?? 0
-            );
-
-            if (map.has(code)) {
-                const e = map.get(code)!;
+        // 按分片顺序聚合，保证累加与单价取值顺序稳定；每条记录只查一次 Map，有单价的物料数随聚合同步计数
+        let withPrice = 0;
+        for (const { code, currentStock, availableStock, storageDays, unitPrice } of allRecords) {
+            const e = map.get(code);
+            if (e) {
                 e.currentStock   += currentStock;
                 e.availableStock += availableStock;
                 e.storageDays = Math.max(e.storageDays, storageDays);
-                if (e.unitPrice === 0 && unitPrice > 0) e.unitPrice = unitPrice;
+                if (e.unitPrice === 0 && unitPrice > 0) {
+                    e.unitPrice = unitPrice;
+                    withPrice++;
+                }
             } else {
                 map.set(code, { currentStock, availableStock, storageDays, unitPrice });
+                if (unitPrice > 0) withPrice++;
             }
         }
 
-        const withPrice = Array.from(map.values()).filter(e => e.unitPrice > 0).length;
         console.log(`[BOM服务] 有效库存物料: ${map.size} 个，其中有单价: ${withPrice} 个`);
     } catch (e) {
         console.error('[BOM服务] 查询库存失败:', e);
@@ -281,7 +391,7 @@ async function fetchUnitPriceMap(materialCodes: string[]): Promise<Map<string, n
         const chunks = chunkArray(materialCodes, BATCH_CHUNK_SIZE);
         console.log(`[BOM服务] 查询物料单价: ${typeId}，物料数: ${materialCodes.length}，分 ${chunks.length} 批(并发${CHUNK_CONCURRENCY})`);
 
-        const allRecords = await parallelChunks(chunks, async (chunk) => {
+        const allPrices = await parallelChunks(chunks, async (chunk) => {
             const response = await ontologyApi.queryObjectInstances(typeId, {
                 condition: {
                     operation: 'and',
@@ -290,14 +400,17 @@ async function fetchUnitPriceMap(materialCodes: string[]): Promise<Map<string, n
                 limit: 5000,
                 need_total: false,
             });
-            return response.entries || (response as any).datas || [];
+            const entries: any[] = response.entries || (response as any).datas || [];
+            const prices: Array<[string, number]> = [];
+            for (const r of entries) {
+                const code = String(r.material_code || '').trim();
+                if (!code) continue;
+                prices.push([code, Number(r.material_standard_price ?? r.unit_price ?? r.unit_cost ?? r.standard_price ?? 0)]);
+            }
+            return prices;
         });
 
-        for (const r of allRecords) {
-            const code = String(r.material_code || '').trim();
-            const price = Number(r.material_standard_price ?? r.unit_price ?? r.unit_cost ?? r.standard_price ?? 0);
-            if (code) map.set(code, price);
-        }
+        for (const [code, price] of allPrices) map.set(code, price);
 
         console.log(`[BOM服务] 有单价物料: ${map.size} 个`);
     } catch (e) {
@@ -310,38 +423,170 @@ async function fetchUnitPriceMap(materialCodes: string[]): Promise<Map<string, n
 // 节点数据填充
 // ============================================================================
 
-/** 将库存和单价填充到 BOM 树节点，并更新 stockStatus */
+/** 树的汇总统计，在 enrichNodes 填充节点的同一次遍历中累计 */
+interface TreeStats {
+    totalValue: number;
+    stagnantCount: number;
+    insufficientCount: number;
+    nodeCount: number;
+}
+
+/**
+ * 将库存和单价填充到 BOM 树节点，更新 stockStatus，并累计汇总统计
+ * 用显式栈按先序遍历（与递归顺序一致），深层 BOM 不受调用栈深度限制
+ */
 function enrichNodes(
-    node: BOMNode,
+    root: BOMNode,
     inventoryMap: Map<string, InventoryEntry>,
-    priceMap: Map<string, number>
+    priceMap: Map<string, number>,
+    stats: TreeStats
 ): void {
-    const inv = inventoryMap.get(node.code);
+    const stack: BOMNode[] = [root];
+
+    while (stack.length > 0) {
+        const node = stack.pop()!;
+        const inv = inventoryMap.get(node.code);
+
+        if (inv) {
+            node.currentStock   = inv.currentStock;
+            node.availableStock = inv.availableStock;
+            node.storageDays    = inv.storageDays;
+        }
+
+        // 单价优先级：material对象 > inventory对象 > 节点原有值
+        // material 对象的 unit_price 更权威（采购价/成本价），inventory 作为兜底
+        const priceFromMaterial  = priceMap.get(node.code) ?? 0;
+        const priceFromInventory = inv?.unitPrice ?? 0;
+        const resolvedPrice = priceFromMaterial > 0
+            ? priceFromMaterial
+            : priceFromInventory > 0
+                ? priceFromInventory
+                : node.unitPrice;
+        if (resolvedPrice > 0) node.unitPrice = resolvedPrice;
+
+        stats.nodeCount++;
+        if (node.level > 0) {
+            // 状态判定与计数放在同一分支，不再对 stockStatus 字符串二次比较
+            if (node.storageDays > 90) {
+                node.stockStatus = 'stagnant';
+                stats.stagnantCount++;
+            } else if (node.currentStock > 0) {
+                node.stockStatus = 'sufficient';
+            } else {
+                node.stockStatus = 'insufficient';
+                stats.insufficientCount++;
+            }
+            stats.totalValue += node.currentStock * node.unitPrice;
+        }
+
+        // 逆序入栈，保证子节点按原顺序出栈
+        const children = node.children;
+        for (let i = children.length - 1; i >= 0; i--) stack.push(children[i]);
+    }
+}
 
-    if (inv) {
-        node.currentStock   = inv.currentStock;
-        node.availableStock = inv.availableStock;
-        node.storageDays    = inv.storageDays;
+/**
+ * 查询产品最新版本的 BOM 主料记录（Step 2 取版本号 + Step 3 精确查询）
+ * @returns 主料记录；该产品无 BOM 时返回 null
+ */
+async function fetchLatestBOMRecords(
+    bomTypeId: string,
+    bomFilterValue: string
+): Promise<BOMRecordsResult> {
+    const timings: Record<string, number> = {};
+    // ── Step 2: 获取最新 bom_version（小查询，仅取版本号）────
+    const tVersion = performance.now();
+    const versionResp = await ontologyApi.queryObjectInstances(bomTypeId, {
+        condition: {
+            operation: 'and',
+            sub_conditions: [
+                { operation: '==', field: 'bom_material_code', value: bomFilterValue },
+            ]
+        },
+        limit: 100,
+        need_total: false,
+        timeout: 120000,
+    });
+    const versionEntries = versionResp.entries || (versionResp as any).datas || [];
+    const latestVersion = versionEntries.reduce(
+        (max: string, r: any) => ((r.bom_version || '') > max ? (r.bom_version || '') : max),
+        ''
+    );
+    timings['1_BOM版本查询'] = Math.round(performance.now() - tVersion);
+
+    if (versionEntries.length === 0) {
+        console.warn(`[BOM服务] 未找到产品 ${bomFilterValue} 的 BOM 数据`);
+        return { records: null, timings };
+    }
+    if (latestVersion) {
+        console.log(`[BOM服务] 最新版本: "${latestVersion}"`);
+    } else {
+        console.warn(`[BOM服务] API 未返回 bom_version，跳过版本过滤`);
+    }
+
+    // ── Step 3: 精确查询 BOM 主料 ──
+    const tBom = performance.now();
+    const step3SubConditions: any[] = [
+        { operation: '==', field: 'bom_material_code', value: bomFilterValue },
+        { operation: '==', field: 'alt_priority', value: 0 },
+    ];
+    if (latestVersion) {
+        step3SubConditions.splice(1, 0, { operation: '==', field: 'bom_version', value: latestVersion });
+    }
+    const response = await ontologyApi.queryAllObjectInstances(bomTypeId, {
+        condition: {
+            operation: 'and',
+            sub_conditions: step3SubConditions,
+        },
+        limit: 10000,
+        need_total: false,
+        timeout: 120000,
+    });
+
+    const records = response.entries || (response as any).datas || [];
+    timings['2_BOM主料查询'] = Math.round(performance.now() - tBom);
+    console.log(`[BOM服务] 版本 "${latestVersion}" 主料记录: ${records.length} 条`);
+    return { records, timings };
+}
+
+/**
+ * 带 TTL 缓存 + in-flight 去重的 BOM 主料记录加载
+ * 同一产品在有效期内重复打开时复用已查询的记录，仅重新构建树并刷新库存/单价；
+ * 每个调用方都拿到独立的记录数组，并把查询耗时写入自己的 perf
+ */
+async function loadLatestBOMRecords(
+    bomTypeId: string,
+    bomFilterValue: string,
+    perf: Record<string, number | string>
+): Promise<any[] | null> {
+    const cacheKey = `${bomTypeId}:${bomFilterValue}`;
+
+    const entry = bomRecordsCache.get(cacheKey);
+    if (entry) {
+        if (Date.now() - entry.timestamp <= BOM_CACHE_TTL) {
+            perf['1_BOM版本查询'] = '缓存';
+            perf['2_BOM主料查询'] = '缓存';
+            console.log(`[BOM服务] 命中 BOM 记录缓存: ${bomFilterValue}`);
+            return entry.data && [...entry.data];
+        }
+        bomRecordsCache.delete(cacheKey);
     }
 
-    // 单价优先级：material对象 > inventory对象 > 节点原有值
-    // material 对象的 unit_price 更权威（采购价/成本价），inventory 作为兜底
-    const priceFromMaterial  = priceMap.get(node.code) ?? 0;
-    const priceFromInventory = inv?.unitPrice ?? 0;
-    const resolvedPrice = priceFromMaterial > 0
-        ? priceFromMaterial
-        : priceFromInventory > 0
-            ? priceFromInventory
-            : node.unitPrice;
-    if (resolvedPrice > 0) node.unitPrice = resolvedPrice;
-
-    if (node.level > 0) {
-        if (node.storageDays > 90)       node.stockStatus = 'stagnant';
-        else if (node.currentStock > 0)  node.stockStatus = 'sufficient';
-        else                             node.stockStatus = 'insufficient';
+    let pending = pendingBomRecords.get(cacheKey);
+    if (!pending) {
+        pending = fetchLatestBOMRecords(bomTypeId, bomFilterValue)
+            .then(result => {
+                bomRecordsCache.set(cacheKey, { data: result.records, timestamp: Date.now() });
+                pendingBomRecords.delete(cacheKey);
+                return result;
+            })
+            .catch(err => { pendingBomRecords.delete(cacheKey); throw err; });
+        pendingBomRecords.set(cacheKey, pending);
     }
 
-    for (const child of node.children) enrichNodes(child, inventoryMap, priceMap);
+    const { records, timings } = await pending;
+    Object.assign(perf, timings);
+    return records && [...records];
 }
 
 // ============================================================================
@@ -354,7 +599,7 @@ function enrichNodes(
  * 流程：
  *   1. 从产品对象的 identity 中取出真实主键字段值，作为 bom_material_code 的过滤条件
  *   2. 查询 BOM 对象（bom_material_code == primaryKeyValue），取最新 bom_version
- *   3. 精确查询最新版本的 BOM 主料（alt_priority=0）
+ *   3. 精确查询最新版本的 BOM 主料（alt_priority=0）；步骤 2-3 的结果按产品缓存 5 分钟
  *   4. 并发查询库存 + 物料单价（分批，每批 100 个物料，5 路并发）
  *   5. 将库存/单价填充到树节点（enrichNodes）
  */
@@ -380,58 +625,9 @@ export async function loadSingleBOMTreeViaQueryInstances(
             `bom过滤值=${bomFilterValue}，对象类型=${bomTypeId}`
         );
 
-        // ── Step 2: 获取最新 bom_version（小查询，仅取版本号）────
-        const tVersion = performance.now();
-        const versionResp = await ontologyApi.queryObjectInstances(bomTypeId, {
-            condition: {
-                operation: 'and',
-                sub_conditions: [
-                    { operation: '==', field: 'bom_material_code', value: bomFilterValue },
-                ]
-            },
-            limit: 100,
-            need_total: false,
-            timeout: 120000,
-        });
-        const versionEntries = versionResp.entries || (versionResp as any).datas || [];
-        const latestVersion = versionEntries.reduce(
-            (max: string, r: any) => ((r.bom_version || '') > max ? (r.bom_version || '') : max),
-            ''
-        );
-        perf['1_BOM版本查询'] = Math.round(performance.now() - tVersion);
-
-        if (versionEntries.length === 0) {
-            console.warn(`[BOM服务] 未找到产品 ${bomFilterValue} 的 BOM 数据`);
-            return null;
-        }
-        if (latestVersion) {
-            console.log(`[BOM服务] 最新版本: "${latestVersion}"`);
-        } else {
-            console.warn(`[BOM服务] API 未返回 bom_version，跳过版本过滤`);
-        }
-
-        // ── Step 3: 精确查询 BOM 主料 ──
-        const tBom = performance.now();
-        const step3SubConditions: any[] = [
-            { operation: '==', field: 'bom_material_code', value: bomFilterValue },
-            { operation: '==', field: 'alt_priority', value: 0 },
-        ];
-        if (latestVersion) {
-            step3SubConditions.splice(1, 0, { operation: '==', field: 'bom_version', value: latestVersion });
-        }
-        const response = await ontologyApi.queryObjectInstances(bomTypeId, {
-            condition: {
-                operation: 'and',
-                sub_conditions: step3SubConditions,
-            },
-            limit: 10000,
-            need_total: false,
-            timeout: 120000,
-        });
-
-        const records = response.entries || (response as any).datas || [];
-        perf['2_BOM主料查询'] = Math.round(performance.now() - tBom);
-        console.log(`[BOM服务] 版本 "${latestVersion}" 主料记录: ${records.length} 条`);
+        // ── Step 2-3: 最新版本 BOM 主料（命中缓存时跳过两次查询）────────────
+        const records = await loadLatestBOMRecords(bomTypeId, bomFilterValue, perf);
+        if (!records) return null;
 
         // ── Step 4: 构建 BOM 树 ──────────────────────────────────────────────
         const tTree = performance.now();
@@ -449,13 +645,10 @@ export async function loadSingleBOMTreeViaQueryInstances(
         ]);
         perf['4_库存+单价(并发)'] = Math.round(performance.now() - tInvPrice);
 
-        // ── Step 6: 填充库存/单价到节点 ─────────────────────────────────────
-        enrichNodes(rootNode, inventoryMap, priceMap);
-
-        // ── Step 7: 汇总统计 ─────────────────────────────────────────────────
-        const stats = { totalValue: 0, stagnantCount: 0, insufficientCount: 0 };
-        calcTreeStats(rootNode, stats);
-        const totalMaterials = countNodes(rootNode) - 1;
+        // ── Step 6: 填充库存/单价到节点，同时汇总统计 ───────────────────────
+        const stats: TreeStats = { totalValue: 0, stagnantCount: 0, insufficientCount: 0, nodeCount: 0 };
+        enrichNodes(rootNode, inventoryMap, priceMap, stats);
+        const totalMaterials = stats.nodeCount - 1;
 
         perf['总耗时_ms'] = Math.round(performance.now() - t0);
         perf['BOM记录数'] = records.length;
@@ -469,7 +469,7 @@ export class DemandPlanningService {
       const entry = responseData[0];
       const logicPropertyValue = entry[logicProperty.name];
 
-      console.log(`[DemandPlanningService] Logic property raw value for '${logicProperty.name}':`, JSON.stringify(logicPropertyValue, null, 2));
+      console.log(`[DemandPlanningService] Logic property raw value for '${logicProperty.name}':`, logicPropertyValue);
 
       if (!logicPropertyValue) {
         console.warn(`[DemandPlanningService] Logic property '${logicProperty.name}' not found in instance data. Entry keys:`, Object.keys(entry));
@@ -537,7 +537,7 @@ export class DemandPlanningService {
       }
 
       const sortedHistory = salesHistory.sort((a, b) => a.month.localeCompare(b.month));
-      console.log(`[DemandPlanningService] Final processed sales history (first 3):`, JSON.stringify(sortedHistory.slice(0, 3), null, 2));
+      console.log(`[DemandPlanningService] Final processed sales history (first 3):`, sortedHistory.slice(0, 3));
       console.log(`[DemandPlanningService] Total history points: ${sortedHistory.length}`);
 
       return sortedHistory;
@@ -939,6 +939,7 @@ export class DemandPlanningService {
           yearlySeasonality: true,
           weeklySeasonality: false,
         },
+        compute_metrics: false, // only forecast_values are used
       };
 
       const result = await forecastOperatorService.forecast('prophet', prophetInput);
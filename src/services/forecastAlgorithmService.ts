@@ -7,6 +7,12 @@
 
 import type { ProductSalesHistory } from '../types/ontology';
 
+/**
+ * History point consumed by the smoothing algorithms
+ * Only month and quantity are read, so API payloads can be passed without re-mapping
+ */
+export type SalesHistoryPoint = Pick<ProductSalesHistory, 'month' | 'quantity'>;
+
 /**
  * Algorithm parameters interface
  */
@@ -35,11 +41,46 @@ export interface ProphetParams {
 
   // Confidence intervals
   intervalWidth: number;                            // Range: 0.5-0.99, probability coverage of intervals
+  uncertaintySamples?: number;                      // Posterior draws for intervals (default 1000), ~200 usually suffices, 0 disables
 
   // Growth model
   growth?: 'linear' | 'logistic' | 'flat';         // Trend growth model
 }
 
+/**
+ * Compare 'YYYY-MM' months
+ *
+ * Fixed-width numeric month strings order the same lexicographically as
+ * chronologically, so plain code-unit comparison avoids localeCompare's collation.
+ */
+function compareMonth(a: string, b: string): number {
+  return a < b ? -1 : a > b ? 1 : 0;
+}
+
+/**
+ * Extract quantities in ascending month order
+ *
+ * Sales history normally arrives already sorted by month, so values are read in
+ * a single pass and the copy + sort is only paid when an out-of-order month is seen.
+ *
+ * @param history Historical sales data
+ * @returns Quantities ordered by month
+ */
+function extractSortedQuantities(history: SalesHistoryPoint[]): number[] {
+  const values = new Array<number>(history.length);
+  let sorted = true;
+  for (let i = 0; i < history.length; i++) {
+    values[i] = history[i].quantity;
+    if (sorted && i > 0 && history[i - 1].month > history[i].month) {
+      sorted = false;
+    }
+  }
+  if (sorted) {
+    return values;
+  }
+  return [...history].sort((a, b) => compareMonth(a.month, b.month)).map((h) => h.quantity);
+}
+
 /**
  * Simple Exponential Smoothing
  *
@@ -52,7 +93,7 @@ export interface ProphetParams {
  * @returns Array of forecasted values
  */
 export function simpleExponentialSmoothing(
-  history: ProductSalesHistory[],
+  history: SalesHistoryPoint[],
   periods: number = 13,
   params?: SmoothingParams
 ): number[] {
@@ -60,16 +101,11 @@ export function simpleExponentialSmoothing(
     return new Array(periods).fill(0);
   }
 
-  // Sort history by month
-  const sortedHistory = [...history].sort((a, b) => a.month.localeCompare(b.month));
-  const values = sortedHistory.map((h) => h.quantity);
+  const values = extractSortedQuantities(history);
 
   // Smoothing parameter (alpha) - use provided or default to 0.2
   const alpha = params?.alpha ?? 0.2;
 
-  // Initialize forecast array
-  const forecasts: number[] = [];
-
   // Calculate initial forecast (use average of first few values)
   let lastForecast = values.length > 0 ? values[0] : 0;
   if (values.length > 1) {
@@ -82,12 +118,8 @@ export function simpleExponentialSmoothing(
   }
 
   // Generate forecasts for future periods
-  for (let i = 0; i < periods; i++) {
-    forecasts.push(lastForecast);
-    // For future periods, forecast remains constant (simple exponential smoothing)
-  }
-
-  return forecasts;
+  // For future periods, forecast remains constant (simple exponential smoothing)
+  return new Array<number>(periods).fill(lastForecast);
 }
 
 /**
@@ -102,7 +134,7 @@ export function simpleExponentialSmoothing(
  * @returns Array of forecasted values
  */
 export function holtLinearSmoothing(
-  history: ProductSalesHistory[],
+  history: SalesHistoryPoint[],
   periods: number = 13,
   params?: SmoothingParams
 ): number[] {
@@ -110,9 +142,7 @@ export function holtLinearSmoothing(
     return new Array(periods).fill(0);
   }
 
-  // Sort history by month
-  const sortedHistory = [...history].sort((a, b) => a.month.localeCompare(b.month));
-  const values = sortedHistory.map((h) => h.quantity);
+  const values = extractSortedQuantities(history);
 
   // Smoothing parameters - use provided or defaults
   const alpha = params?.alpha ?? 0.3; // Level smoothing
@@ -130,14 +160,56 @@ export function holtLinearSmoothing(
   }
 
   // Generate forecasts for future periods
-  const forecasts: number[] = [];
+  const forecasts = new Array<number>(periods);
   for (let i = 0; i < periods; i++) {
-    forecasts.push(level + trend * (i + 1));
+    forecasts[i] = level + trend * (i + 1);
   }
 
   return forecasts;
 }
 
+/**
+ * Run the Holt-Winters update recurrence over the historical values
+ *
+ * Kept as a tight loop over numeric arguments and a typed seasonal buffer so the
+ * engine can compile it to native code; seasonal factors are updated in place.
+ *
+ * @param values Historical values in month order
+ * @param seasonal Initial seasonal factors (mutated)
+ * @param level Initial level
+ * @param trend Initial trend
+ * @returns Final level and trend
+ */
+function fitHoltWinters(
+  values: number[],
+  seasonal: Float64Array,
+  level: number,
+  trend: number,
+  alpha: number,
+  beta: number,
+  gamma: number
+): { level: number; trend: number } {
+  const seasonLength = seasonal.length;
+  for (let i = 1; i < values.length; i++) {
+    const prevLevel = level;
+    const seasonalIndex = i % seasonLength;
+    const seasonalFactor = seasonal[seasonalIndex] || 1; // Protect against 0
+    const levelFactor = level || 1; // Protect against 0
+
+    level = alpha * (values[i] / seasonalFactor) + (1 - alpha) * (level + trend);
+    trend = beta * (level - prevLevel) + (1 - beta) * trend;
+    seasonal[seasonalIndex] = gamma * (values[i] / levelFactor) + (1 - gamma) * seasonalFactor;
+
+    // Ensure values stay valid
+    if (!Number.isFinite(level)) level = prevLevel;
+    if (!Number.isFinite(trend)) trend = 0;
+    if (!Number.isFinite(seasonal[seasonalIndex])) {
+      seasonal[seasonalIndex] = 1;
+    }
+  }
+  return { level, trend };
+}
+
 /**
  * Holt-Winters Triple Exponential Smoothing
  *
@@ -150,7 +222,7 @@ export function holtLinearSmoothing(
  * @returns Array of forecasted values
  */
 export function holtWintersSmoothing(
-  history: ProductSalesHistory[],
+  history: SalesHistoryPoint[],
   periods: number = 13,
   params?: SmoothingParams
 ): number[] {
@@ -158,9 +230,7 @@ export function holtWintersSmoothing(
     return new Array(periods).fill(0);
   }
 
-  // Sort history by month
-  const sortedHistory = [...history].sort((a, b) => a.month.localeCompare(b.month));
-  const values = sortedHistory.map((h) => h.quantity);
+  const values = extractSortedQuantities(history);
 
   // Season length - use provided or default to 12
   const seasonLength = params?.seasonLength ?? 12;
@@ -178,15 +248,17 @@ export function holtWintersSmoothing(
   const gamma = params?.gamma ?? 0.2; // Seasonal smoothing
 
   // Initialize seasonal components
-  const seasonal: number[] = [];
+  // Use average of corresponding seasonal periods, accumulated in a single pass over values
+  const seasonal = new Float64Array(seasonLength);
+  const seasonCounts = new Uint32Array(seasonLength);
+  for (let j = 0; j < values.length; j++) {
+    const seasonalIndex = j % seasonLength;
+    seasonal[seasonalIndex] += values[j];
+    seasonCounts[seasonalIndex]++;
+  }
   for (let i = 0; i < seasonLength; i++) {
-    // Use average of corresponding seasonal periods
-    let sum = 0;
-    let count = 0;
-    for (let j = i; j < values.length; j += seasonLength) {
-      sum += values[j];
-      count++;
-    }
+    const sum = seasonal[i];
+    const count = seasonCounts[i];
     // Ensure seasonal value is never 0 to avoid division by zero
     seasonal[i] = count > 0 && sum > 0 ? sum / count : 1;
   }
@@ -215,34 +287,124 @@ export function holtWintersSmoothing(
     trend = (lastSeasonalAdjusted - firstSeasonalAdjusted) / lastIdx;
   }
 
-  // Apply Holt-Winters method to historical data
-  for (let i = 1; i < values.length; i++) {
-    const prevLevel = level;
-    const seasonalIndex = i % seasonLength;
-    const seasonalFactor = seasonal[seasonalIndex] || 1; // Protect against 0
-    const levelFactor = level || 1; // Protect against 0
-
-    level = alpha * (values[i] / seasonalFactor) + (1 - alpha) * (level + trend);
-    trend = beta * (level - prevLevel) + (1 - beta) * trend;
-    seasonal[seasonalIndex] = gamma * (values[i] / levelFactor) + (1 - gamma) * seasonalFactor;
-
-    // Ensure values stay valid
-    if (!isFinite(level) || isNaN(level)) level = prevLevel;
-    if (!isFinite(trend) || isNaN(trend)) trend = 0;
-    if (!isFinite(seasonal[seasonalIndex]) || isNaN(seasonal[seasonalIndex])) {
-      seasonal[seasonalIndex] = 1;
-    }
-  }
+  // Apply Holt-Winters method to historical data (updates seasonal in place)
+  ({ level, trend } = fitHoltWinters(values, seasonal, level, trend, alpha, beta, gamma));
 
   // Generate forecasts for future periods
-  const forecasts: number[] = [];
+  const forecasts = new Array<number>(periods);
   for (let i = 0; i < periods; i++) {
     const seasonalIndex = (values.length + i) % seasonLength;
     const forecastValue = (level + trend * (i + 1)) * seasonal[seasonalIndex];
     // Ensure forecast is valid
-    forecasts.push(isFinite(forecastValue) && !isNaN(forecastValue) ? forecastValue : 0);
+    forecasts[i] = Number.isFinite(forecastValue) ? forecastValue : 0;
   }
 
   return forecasts;
 }
 
+
+/**
+ * Smoothing algorithms available for local forecasting and backtesting
+ */
+export type SmoothingAlgorithm = 'simple_exponential' | 'holt_linear' | 'holt_winters';
+
+/**
+ * One-step-ahead backtest over expanding training windows
+ *
+ * result[i] is the forecast for history[i] made from history[0..i-1], for every
+ * i >= minTraining; earlier entries hold the actual value.
+ *
+ * Simple exponential and Holt linear smoothing only move forward through the data,
+ * so for month-ordered history every window's forecast is read off a single pass
+ * instead of refitting each window. Holt-Winters initialises from the whole window
+ * and is still refitted per window.
+ *
+ * @param history Historical sales data
+ * @param algorithm Smoothing algorithm
+ * @param params Optional algorithm parameters
+ * @param minTraining Minimum number of points before the first backtest value
+ * @returns Backtest values aligned with history
+ */
+export function oneStepBacktest(
+  history: SalesHistoryPoint[],
+  algorithm: SmoothingAlgorithm,
+  params?: SmoothingParams,
+  minTraining: number = 2
+): number[] {
+  const n = history.length;
+  const result = new Array<number>(n);
+  for (let i = 0; i < n; i++) {
+    result[i] = history[i].quantity;
+  }
+
+  let sorted = true;
+  for (let i = 1; i < n && sorted; i++) {
+    if (history[i - 1].month > history[i].month) sorted = false;
+  }
+
+  const refit = (window: number): number => {
+    const trainingData = history.slice(0, window);
+    switch (algorithm) {
+      case 'holt_winters':
+        return holtWintersSmoothing(trainingData, 1, params)[0];
+      case 'holt_linear':
+        return holtLinearSmoothing(trainingData, 1, params)[0];
+      case 'simple_exponential':
+      default:
+        return simpleExponentialSmoothing(trainingData, 1, params)[0];
+    }
+  };
+
+  const start = Math.max(minTraining, 1);
+  if (!sorted || algorithm === 'holt_winters') {
+    for (let i = start; i < n; i++) {
+      result[i] = refit(i);
+    }
+    return result;
+  }
+
+  const values = result.slice();
+
+  if (algorithm === 'holt_linear') {
+    // Windows of 2+ points share the same initial level/trend
+    const alpha = params?.alpha ?? 0.3;
+    const beta = params?.beta ?? 0.1;
+    let level = values[0];
+    let trend = n > 1 ? values[1] - values[0] : 0;
+    for (let i = 1; i < n; i++) {
+      // level/trend currently reflect values[0..i-1]
+      if (i >= start) {
+        result[i] = i >= 2 ? level + trend : refit(i);
+      }
+      const prevLevel = level;
+      level = alpha * values[i] + (1 - alpha) * (level + trend);
+      trend = beta * (level - prevLevel) + (1 - beta) * trend;
+    }
+    return result;
+  }
+
+  // Simple exponential: windows of 3+ points share the same initial average
+  const alpha = params?.alpha ?? 0.2;
+  let lastForecast = n >= 3 ? (values[0] + values[1] + values[2]) / 3 : 0;
+  for (let i = 0; i < n; i++) {
+    // lastForecast currently reflects values[0..i-1]
+    if (i >= start) {
+      result[i] = i >= 3 ? lastForecast : refit(i);
+    }
+    lastForecast = alpha * values[i] + (1 - alpha) * lastForecast;
+  }
+  return result;
+}
+
+/**
+ * Round forecast values to non-negative integers in place
+ *
+ * @param values Forecast values owned by the caller
+ * @returns The same array, with each value replaced by max(0, round(value))
+ */
+export function roundNonNegativeInPlace(values: number[]): number[] {
+  for (let i = 0; i < values.length; i++) {
+    values[i] = Math.max(0, Math.round(values[i]));
+  }
+  return values;
+}
@@ -20,10 +20,11 @@ import {
   simpleExponentialSmoothing,
   holtLinearSmoothing,
   holtWintersSmoothing,
+  roundNonNegativeInPlace,
   type ProphetParams,
   type SmoothingParams,
 } from './forecastAlgorithmService';
-import type { ProductSalesHistory, ForecastAlgorithm } from '../types/ontology';
+import type { ForecastAlgorithm } from '../types/ontology';
 
 // Re-export ForecastAlgorithm for convenience
 export type { ForecastAlgorithm };
@@ -37,6 +38,8 @@ export interface ForecastInput {
   historical_data: Array<{ month: string; quantity: number }>;
   forecast_periods: number;
   parameters?: Record<string, any>;
+  /** 是否需要服务端计算样本内拟合指标（metrics），不需要时可跳过样本内预测 */
+  compute_metrics?: boolean;
 }
 
 /**
@@ -79,6 +82,29 @@ const ALGORITHM_ENDPOINTS: Record<ForecastAlgorithm, string> = {
   ensemble: '/api/v1/forecast/ensemble',
 };
 
+// Prophet API 不可用时的 Holt-Winters 降级参数（模块级冻结，避免每次降级重建）
+const PROPHET_FALLBACK_HW_PARAMS: Readonly<SmoothingParams> = Object.freeze({
+  alpha: 0.3,
+  beta: 0.1,
+  gamma: 0.2,
+  seasonLength: 12,
+});
+
+// 本地 Holt-Winters 预测参数（月度数据，季节长度 12）
+const LOCAL_HW_PARAMS: Readonly<SmoothingParams> = Object.freeze({ seasonLength: 12 });
+
+/**
+ * 深拷贝预测结果（含置信区间与指标），缓存与调用方之间互不共享可变对象
+ */
+function cloneForecastOutput(result: ForecastOutput): ForecastOutput {
+  return {
+    ...result,
+    forecast_values: [...result.forecast_values],
+    confidence_intervals: result.confidence_intervals?.map(interval => ({ ...interval })),
+    metrics: result.metrics ? { ...result.metrics } : undefined,
+  };
+}
+
 // 支持本地回退的算法
 const LOCAL_SUPPORTED_ALGORITHMS: ForecastAlgorithm[] = [
   'simple_exponential',
@@ -96,6 +122,9 @@ export class ForecastOperatorService {
   private apiAvailable: boolean | null = null; // 缓存API可用性
   private lastHealthCheck: number = 0;
   private healthCheckInterval: number = 60000; // 1分钟
+  private pendingHealthCheck: Promise<boolean> | null = null; // 进行中的健康检查
+  private resultCache = new Map<string, ForecastOutput>(); // API 预测结果缓存（LRU）
+  private resultCacheMaxSize: number = 128;
 
   constructor() {
     const envConfig = getEnvironmentConfig();
@@ -114,16 +143,29 @@ export class ForecastOperatorService {
       return this.apiAvailable;
     }
 
-    try {
-      const url = `${this.baseUrl}/health`;
-      const response = await httpClient.get(url, { timeout: 5000 });
-      this.apiAvailable = response.status === 200;
-    } catch {
-      this.apiAvailable = false;
+    // 并发预测（如批量/多产品）共享同一次探测，避免重复请求 /health
+    if (this.pendingHealthCheck) {
+      return this.pendingHealthCheck;
     }
 
-    this.lastHealthCheck = now;
-    return this.apiAvailable;
+    this.pendingHealthCheck = (async () => {
+      try {
+        const url = `${this.baseUrl}/health`;
+        const response = await httpClient.get(url, { timeout: 5000 });
+        this.apiAvailable = response.status === 200;
+      } catch {
+        this.apiAvailable = false;
+      }
+
+      this.lastHealthCheck = now;
+      return this.apiAvailable;
+    })();
+
+    try {
+      return await this.pendingHealthCheck;
+    } finally {
+      this.pendingHealthCheck = null;
+    }
   }
 
   /**
@@ -138,6 +180,14 @@ export class ForecastOperatorService {
       return this.forecastProphet(input as ProphetForecastInput);
     }
 
+    // 相同输入直接复用已有的 API 结果（请求体只序列化一次，同时用于缓存键和 API 调用）
+    const requestJson = JSON.stringify(input);
+    const cacheKey = this.getCacheKey(algorithm, requestJson);
+    const cached = this.getCachedResult(cacheKey);
+    if (cached) {
+      return cached;
+    }
+
     // 首先尝试调用 API
     try {
       const isApiAvailable = await this.healthCheck();
@@ -148,8 +198,10 @@ export class ForecastOperatorService {
 
         const response = await httpClient.post<ForecastOutput>(url, input, {
           timeout: this.timeout,
+          serializedBody: requestJson,
         });
 
+        this.setCachedResult(cacheKey, response.data);
         return response.data;
       }
     } catch (error) {
@@ -172,7 +224,16 @@ export class ForecastOperatorService {
   private async forecastProphet(
     input: ProphetForecastInput
   ): Promise<ForecastOutput & { usedFallback?: boolean }> {
-    const params = input.parameters;
+    // 转换前端参数为 API 格式
+    const apiInput = this.convertProphetParamsToApiFormat(input);
+
+    // Prophet 拟合代价高，相同数据 + 参数直接复用已有结果
+    const requestJson = JSON.stringify(apiInput);
+    const cacheKey = this.getCacheKey('prophet', requestJson);
+    const cached = this.getCachedResult(cacheKey);
+    if (cached) {
+      return cached;
+    }
 
     // 首先尝试调用 Prophet API
     try {
@@ -183,14 +244,13 @@ export class ForecastOperatorService {
         const endpoint = ALGORITHM_ENDPOINTS.prophet;
         const url = `${this.baseUrl}${endpoint}`;
 
-        // 转换前端参数为 API 格式
-        const apiInput = this.convertProphetParamsToApiFormat(input);
-
         const response = await httpClient.post<ForecastOutput>(url, apiInput, {
           timeout: this.timeout,
+          serializedBody: requestJson,
         });
 
         console.log(`[ForecastOperatorService] Prophet API 调用成功`);
+        this.setCachedResult(cacheKey, response.data);
         return response.data;
       }
     } catch (error) {
@@ -200,23 +260,10 @@ export class ForecastOperatorService {
     // API 不可用或调用失败，使用 Holt-Winters 降级
     console.log(`[ForecastOperatorService] Prophet API 不可用，使用 Holt-Winters 降级`);
 
-    // 将 Prophet 参数转换为 Holt-Winters 兼容的参数
-    const hwParams: SmoothingParams = {
-      alpha: 0.3,
-      beta: 0.1,
-      gamma: 0.2,
-      seasonLength: 12,
-    };
-
-    // 转换输入数据为 ProductSalesHistory 格式
-    const history: ProductSalesHistory[] = input.historical_data.map(h => ({
-      productId: input.product_id,
-      month: h.month,
-      quantity: h.quantity,
-    }));
-
-    let forecastValues = holtWintersSmoothing(history, input.forecast_periods, hwParams);
-    forecastValues = forecastValues.map(v => Math.max(0, Math.round(v)));
+    // historical_data 已满足 SalesHistoryPoint 结构，直接传入算法，无需逐条转换
+    const forecastValues = roundNonNegativeInPlace(
+      holtWintersSmoothing(input.historical_data, input.forecast_periods, PROPHET_FALLBACK_HW_PARAMS)
+    );
 
     return {
       product_id: input.product_id,
@@ -227,6 +274,39 @@ export class ForecastOperatorService {
     };
   }
 
+  /**
+   * 预测结果缓存键：算法 + 完整请求体 JSON（历史数据、预测期数、参数）
+   */
+  private getCacheKey(algorithm: ForecastAlgorithm, requestJson: string): string {
+    return `${algorithm}:${requestJson}`;
+  }
+
+  /**
+   * 读取缓存结果（命中时刷新 LRU 顺序，返回副本避免调用方修改缓存）
+   */
+  private getCachedResult(key: string): ForecastOutput | null {
+    const cached = this.resultCache.get(key);
+    if (!cached) {
+      return null;
+    }
+    this.resultCache.delete(key);
+    this.resultCache.set(key, cached);
+    return cloneForecastOutput(cached);
+  }
+
+  /**
+   * 写入缓存结果，超出容量时淘汰最久未使用的条目
+   */
+  private setCachedResult(key: string, result: ForecastOutput): void {
+    this.resultCache.set(key, cloneForecastOutput(result));
+    if (this.resultCache.size > this.resultCacheMaxSize) {
+      const oldestKey = this.resultCache.keys().next().value;
+      if (oldestKey !== undefined) {
+        this.resultCache.delete(oldestKey);
+      }
+    }
+  }
+
   /**
    * 转换 Prophet 前端参数为 API 格式
    */
@@ -245,7 +325,9 @@ export class ForecastOperatorService {
         seasonality_prior_scale: params.seasonalityPriorScale || 10,
         interval_width: params.intervalWidth || 0.95,
         growth: params.growth || 'linear',
+        ...(params.uncertaintySamples !== undefined ? { uncertainty_samples: params.uncertaintySamples } : {}),
       } : undefined,
+      ...(input.compute_metrics !== undefined ? { compute_metrics: input.compute_metrics } : {}),
     };
   }
 
@@ -295,12 +377,8 @@ export class ForecastOperatorService {
     algorithm: ForecastAlgorithm,
     input: ForecastInput
   ): Promise<ForecastOutput> {
-    // 转换输入数据为 ProductSalesHistory 格式
-    const history: ProductSalesHistory[] = input.historical_data.map(h => ({
-      productId: input.product_id,
-      month: h.month,
-      quantity: h.quantity,
-    }));
+    // historical_data 已满足 SalesHistoryPoint 结构，直接传入算法，无需逐条转换
+    const history = input.historical_data;
 
     let forecastValues: number[];
 
@@ -312,15 +390,15 @@ export class ForecastOperatorService {
         forecastValues = holtLinearSmoothing(history, input.forecast_periods);
         break;
       case 'holt_winters':
-        forecastValues = holtWintersSmoothing(history, input.forecast_periods, { seasonLength: 12 });
+        forecastValues = holtWintersSmoothing(history, input.forecast_periods, LOCAL_HW_PARAMS);
         break;
       default:
         // Prophet、ARIMA、集成预测需要后端支持
         throw new Error(`算法 ${algorithm} 需要后端API支持`);
     }
 
-    // 确保预测值非负
-    forecastValues = forecastValues.map(v => Math.max(0, Math.round(v)));
+    // 确保预测值非负（原地取整，算法输出为新数组）
+    roundNonNegativeInPlace(forecastValues);
 
     return {
       product_id: input.product_id,
@@ -687,10 +687,11 @@ export async function fetchMaterialReadyV2Data(productCode: string): Promise<{
   console.log(`[mpsDataService] ========== fetchMaterialReadyV2Data 开始 ==========`);
   console.log(`[mpsDataService] 产品编码: ${productCode}`);
 
-  // Step 1: 获取产品信息和生产计划
-  const [product, productionPlans] = await Promise.all([
+  // Step 1: 并行获取产品信息、生产计划和BOM数据（三者只依赖产品编码）
+  const [product, productionPlans, bomItems] = await Promise.all([
     fetchProductExtendedInfo(productCode),
     fetchProductionPlan(productCode),
+    fetchBOMData(productCode),
   ]);
 
   // 取第一个生产计划（或优先级最高的）
@@ -700,19 +701,16 @@ export async function fetchMaterialReadyV2Data(productCode: string): Promise<{
 
   console.log(`[mpsDataService] 产品信息:`, product);
   console.log(`[mpsDataService] 生产计划:`, productionPlan);
-
-  // Step 2: 获取BOM数据
-  const bomItems = await fetchBOMData(productCode);
   console.log(`[mpsDataService] BOM数据: ${bomItems.length} 条`);
 
-  // Step 3: 提取所有物料编码
+  // Step 2: 提取所有物料编码
   const allMaterialCodes = new Set<string>();
   for (const bom of bomItems) {
     allMaterialCodes.add(bom.child_code);
   }
   const materialCodeList = Array.from(allMaterialCodes);
 
-  // Step 4: 并行获取物料详情和库存
+  // Step 3: 并行获取物料详情和库存
   const [materialDetails, inventoryMap] = await Promise.all([
     fetchMaterialDetails(materialCodeList),
     fetchInventoryBatch(materialCodeList),
@@ -262,21 +262,50 @@ function chunkArray<T>(arr: T[], size: number): T[][] {
 /**
  * 并行执行分片任务，控制最大并发数。
  * Phase 2b 性能优化：将串行 for...of 改为受控并行。
+ * 采用滑动窗口：任一分片完成即补发下一个，而不是整批等待最慢的请求。
  */
 async function parallelChunks<T>(
     chunks: T[][],
     fn: (chunk: T[]) => Promise<any[]>,
     concurrency = CHUNK_CONCURRENCY,
 ): Promise<any[]> {
+    const chunkResults: any[][] = new Array(chunks.length);
+    let nextIndex = 0;
+    let failed = false;
+    const worker = async () => {
+        while (!failed && nextIndex < chunks.length) {
+            const index = nextIndex++;
+            try {
+                chunkResults[index] = await fn(chunks[index]);
+            } catch (e) {
+                failed = true;
+                throw e;
+            }
+        }
+    };
+    const workers: Promise<void>[] = [];
+    for (let w = 0; w < Math.min(concurrency, chunks.length); w++) workers.push(worker());
+    await Promise.all(workers);
+
+    // 按分片顺序合并结果
     const allData: any[] = [];
-    for (let i = 0; i < chunks.length; i += concurrency) {
-        const batch = chunks.slice(i, i + concurrency);
-        const results = await Promise.all(batch.map(chunk => fn(chunk)));
-        results.forEach(r => allData.push(...r));
-    }
+    chunkResults.forEach(r => allData.push(...r));
     return allData;
 }
 
+/**
+ * 数值字段解析：API 已返回 number 时直接使用，仅字符串等才走 parseFloat。
+ * 结果为 NaN / 0 时取 fallback（与原 `parseFloat(x) || fallback` 语义一致）。
+ */
+function toNumber(value: any, fallback = 0): number {
+    return (typeof value === 'number' ? value : parseFloat(value)) || fallback;
+}
+
+/** 整数字段解析：同 toNumber，number 用 Math.trunc 截断小数（与 parseInt 一致），其余走 parseInt */
+function toInt(value: any, fallback = 0): number {
+    return (typeof value === 'number' ? Math.trunc(value) : parseInt(value)) || fallback;
+}
+
 /**
  * 将日期字符串补全为 OpenSearch 兼容的 datetime 格式。
  * OpenSearch 的 biztime 字段要求 `yyyy-MM-dd HH:mm:ss` 格式，
@@ -359,7 +388,7 @@ export async function loadForecastByProduct(productCode: string): Promise<Foreca
             material_name: item.material_name || '',
             startdate: item.startdate || '',
             enddate: item.enddate || '',
-            qty: parseFloat(item.qty) || 0,
+            qty: toNumber(item.qty),
             bizdate: item.bizdate || '',
             creator_name: item.creator_name || '',
             auditdate: item.auditdate || '',
@@ -395,9 +424,7 @@ export async function loadProductDemandPlans(forceReload: boolean = false): Prom
             product_name: item.product_name || '',
             product_code: item.product_code || '',
             planned_date: item.planned_date || '',
-            planned_demand_quantity: typeof item.planned_demand_quantity === 'number'
-                ? item.planned_demand_quantity
-                : parseInt(item.planned_demand_quantity) || 0,
+            planned_demand_quantity: toInt(item.planned_demand_quantity),
         }));
 
         console.log(`[PlanningV2DataService] 加载了 ${plans.length} 条产品需求计划`);
@@ -479,15 +506,11 @@ export async function loadProductionPlans(forceReload: boolean = false): Promise
         const plans: ProductionPlanAPI[] = response.entries.map((item: any) => ({
             bom_code: item.bom_code || '',
             product_category: item.product_category || '',
-            quantity: typeof item.quantity === 'number'
-                ? item.quantity
-                : parseInt(item.quantity) || 0,
+            quantity: toInt(item.quantity),
             product_name: item.product_name || '',
             planned_start_date: item.planned_start_date || '',
             order_type: item.order_type || '',
-            seq_no: typeof item.seq_no === 'number'
-                ? item.seq_no
-                : parseInt(item.seq_no) || 0,
+            seq_no: toInt(item.seq_no),
         }));
 
         plans.sort((a, b) => a.seq_no - b.seq_no);
@@ -523,9 +546,7 @@ export async function loadMaterialRequirementPlans(forceReload: boolean = false)
             specification: item.specification || '',
             component_name: item.component_name || '',
             planned_date: item.planned_date || '',
-            material_demand_quantity: typeof item.material_demand_quantity === 'number'
-                ? item.material_demand_quantity
-                : parseFloat(item.material_demand_quantity) || 0,
+            material_demand_quantity: toNumber(item.material_demand_quantity),
             main_material: item.main_material || '',
         }));
 
@@ -594,9 +615,9 @@ function parseMRPPlanOrder(item: any): MRPPlanOrderAPI {
         materialplanid_number: item.materialplanid_number || '',
         materialplanid_name: item.materialplanid_name || '',
         materialattr_title: item.materialattr_title || '',
-        adviseorderqty: parseFloat(item.adviseorderqty) || 0,
-        bizorderqty: parseFloat(item.bizorderqty) || 0,
-        bizdropqty: parseFloat(item.bizdropqty) || 0,
+        adviseorderqty: toNumber(item.adviseorderqty),
+        bizorderqty: toNumber(item.bizorderqty),
+        bizdropqty: toNumber(item.bizdropqty),
         advisedroptime: item.advisedroptime || '',
         advisestartdate: item.advisestartdate || '',
         adviseenddate: item.adviseenddate || '',
@@ -803,9 +824,9 @@ function parsePRRecord(item: any): PRRecord {
         billno: item.billno || '',
         material_number: item.material_number || '',
         material_name: item.material_name || '',
-        qty: parseFloat(item.qty) || 0,
+        qty: toNumber(item.qty),
         biztime: item.biztime || '',
-        joinqty: parseFloat(item.joinqty) || 0,
+        joinqty: toNumber(item.joinqty),
         auditdate: item.auditdate || '',
         org_name: item.org_name || '',
         billtype_name: item.billtype_name || '',
@@ -917,13 +938,13 @@ function parsePORecord(item: any): PORecord {
         billno: item.billno || '',
         material_number: item.material_number || '',
         material_name: item.material_name || '',
-        qty: parseFloat(item.qty) || 0,
+        qty: toNumber(item.qty),
         biztime: item.biztime || '',
         deliverdate: item.deliverdate || '',
         supplier_name: item.supplier_name || '',
         operatorname: item.operatorname || '',
         srcbillnumber: item.srcbillnumber || '',
-        actqty: parseFloat(item.actqty) || 0,
+        actqty: toNumber(item.actqty),
     };
 }
 
@@ -1000,17 +1021,16 @@ export async function loadBOMByProduct(productCode: string): Promise<BOMRecord[]
 
         // PRD D2: BOM 字段容错解析
         const data: BOMRecord[] = response.entries.map((item: any) => {
-            const altPriority = item.alt_priority != null ? parseInt(item.alt_priority) : 0;
             return {
                 bom_material_code: item.bom_material_code || '',
                 material_code: item.material_code || '',
                 material_name: item.material_name || '',
                 parent_material_code: item.parent_material_code || '',
-                bom_level: parseInt(item.bom_level) || 1,
-                standard_usage: parseFloat(item.standard_usage) || 0,
+                bom_level: toInt(item.bom_level, 1),
+                standard_usage: toNumber(item.standard_usage),
                 bom_version: item.bom_version || '',
                 alt_part: item.alt_part || '',
-                alt_priority: isNaN(altPriority) ? 0 : altPriority,
+                alt_priority: toInt(item.alt_priority),
                 alt_method: item.alt_method || '',
                 alt_group_no: item.alt_group_no || '',
             };
@@ -1103,17 +1123,16 @@ export async function loadBOMSubstitutes(productCode: string): Promise<BOMRecord
         });
 
         const allRecords: BOMRecord[] = (response.entries || []).map((item: any) => {
-            const altPriority = item.alt_priority != null ? parseInt(item.alt_priority) : 0;
             return {
                 bom_material_code: item.bom_material_code || '',
                 material_code: item.material_code || '',
                 material_name: item.material_name || '',
                 parent_material_code: item.parent_material_code || '',
-                bom_level: parseInt(item.bom_level) || 1,
-                standard_usage: parseFloat(item.standard_usage) || 0,
+                bom_level: toInt(item.bom_level, 1),
+                standard_usage: toNumber(item.standard_usage),
                 bom_version: item.bom_version || '',
                 alt_part: item.alt_part || '',
-                alt_priority: isNaN(altPriority) ? 0 : altPriority,
+                alt_priority: toInt(item.alt_priority),
                 alt_method: item.alt_method || '',
                 alt_group_no: item.alt_group_no || '',
             };
@@ -1210,9 +1229,9 @@ export async function loadPRByMaterials(materialCodes: string[]): Promise<PRReco
                 billno: item.billno || '',
                 material_number: item.material_number || '',
                 material_name: item.material_name || '',
-                qty: parseFloat(item.qty) || 0,
+                qty: toNumber(item.qty),
                 biztime: item.biztime || '',
-                joinqty: parseFloat(item.joinqty) || 0,
+                joinqty: toNumber(item.joinqty),
                 auditdate: item.auditdate || '',
                 org_name: item.org_name || '',
                 billtype_name: item.billtype_name || '',
@@ -1262,13 +1281,13 @@ export async function loadPOByMaterials(materialCodes: string[]): Promise<POReco
                 billno: item.billno || '',
                 material_number: item.material_number || '',
                 material_name: item.material_name || '',
-                qty: parseFloat(item.qty) || 0,
+                qty: toNumber(item.qty),
                 biztime: item.biztime || '',
                 deliverdate: item.deliverdate || '',
                 supplier_name: item.supplier_name || '',
                 operatorname: item.operatorname || '',
                 srcbillnumber: item.srcbillnumber || '',
-                actqty: parseFloat(item.actqty) || 0,
+                actqty: toNumber(item.actqty),
             }));
         });
 
@@ -1317,18 +1336,18 @@ export async function loadInventoryByMaterials(materialCodes: string[]): Promise
                 timeout: 120000,
             });
             return response.entries.map((item: any) => ({
-                seq_no: parseInt(item.seq_no) || 0,
+                seq_no: toInt(item.seq_no),
                 material_code: item.material_code || '',
                 material_name: item.material_name || '',
-                inventory_qty: parseFloat(item.inventory_qty) || 0,
-                available_inventory_qty: parseFloat(item.available_inventory_qty) || 0,
-                reserved_inventory_qty: parseFloat(item.reserved_inventory_qty) || 0,
+                inventory_qty: toNumber(item.inventory_qty),
+                available_inventory_qty: toNumber(item.available_inventory_qty),
+                reserved_inventory_qty: toNumber(item.reserved_inventory_qty),
                 inbound_date: item.inbound_date || '',
                 warehouse: item.warehouse || '',
                 stock_status: item.stock_status || '',
                 stock_type: item.stock_type || '',
                 batch_no: item.batch_no || '',
-                purchase_qty: parseFloat(item.purchase_qty) || 0,
+                purchase_qty: toNumber(item.purchase_qty),
             }));
         });
 
@@ -1431,12 +1450,12 @@ function parseMPSWorkOrder(item: any): MPSWorkOrderAPI {
         billno: item.billno || '',
         material_number: item.material_number || '',
         material_name: item.material_name || '',
-        qty: parseFloat(item.qty) || 0,
+        qty: toNumber(item.qty),
         planstartdate: item.planstartdate || '',
         planfinishdate: item.planfinishdate || '',
         actualstartdate: item.actualstartdate || '',
         actualfinishdate: item.actualfinishdate || '',
-        stockinqty: parseFloat(item.stockinqty) || 0,
+        stockinqty: toNumber(item.stockinqty),
         taskstatus_title: item.taskstatus_title || '',
         pickstatus_title: item.pickstatus_title || '',
         sourcebillnumber: item.sourcebillnumber || '',
@@ -574,6 +574,35 @@ function buildBomChildrenIndex(boms: BOMInfo[]): BomChildrenIndex {
     return index;
 }
 
+/** 产品库存计算用索引：产品 BOM 行、在用物料/产品库存合计 */
+export interface ProductStockIndex {
+    bomsByProduct: Map<string, BOMInfo[]>;
+    activeMaterialStock: Map<string, number>;
+    activeProductStock: Map<string, number>;
+}
+
+function buildProductStockIndex(boms: BOMInfo[], inventories: InventoryInfo[]): ProductStockIndex {
+    const bomsByProduct = new Map<string, BOMInfo[]>();
+    for (const bom of boms) {
+        const list = bomsByProduct.get(bom.bom_material_code);
+        if (list) list.push(bom);
+        else bomsByProduct.set(bom.bom_material_code, [bom]);
+    }
+
+    const activeMaterialStock = new Map<string, number>();
+    const activeProductStock = new Map<string, number>();
+    for (const inv of inventories) {
+        if (inv.status !== 'Active') continue;
+        const target = inv.item_type === 'Material'
+            ? activeMaterialStock
+            : inv.item_type === 'Product' ? activeProductStock : null;
+        if (!target) continue;
+        target.set(inv.item_code, (target.get(inv.item_code) ?? 0) + (parseInt(inv.quantity) || 0));
+    }
+
+    return { bomsByProduct, activeMaterialStock, activeProductStock };
+}
+
 function buildSuppliersByMaterialIndex(suppliers: SupplierInfo[]): SuppliersByMaterialIndex {
     const index: SuppliersByMaterialIndex = new Map();
     for (const supplier of suppliers) {
@@ -695,21 +724,24 @@ function buildMaterialMasterIndex(materials: MaterialInfo[]): Map<string, Materi
     return index;
 }
 
-function buildAlternativesIndex(
-    boms: BOMInfo[],
-    visitedParents: Set<string>
-): {
+/**
+ * 替代料索引（按父项编码分组，覆盖全部BOM行）
+ * 只依赖BOM数据，一次构建后供所有产品共享，按产品的 visitedParents 查表即可
+ */
+interface AlternativesIndex {
     byParentAndGroup: Map<string, Map<number, { mains: Set<string>; alternatives: Set<string> }>>;
     fallbackAlternativesByParent: Map<string, Set<string>>;
     mainsByParent: Map<string, Set<string>>;
-} {
+}
+
+function buildAlternativesIndex(boms: BOMInfo[]): AlternativesIndex {
     const byParentAndGroup = new Map<string, Map<number, { mains: Set<string>; alternatives: Set<string> }>>();
     const fallbackAlternativesByParent = new Map<string, Set<string>>();
     const mainsByParent = new Map<string, Set<string>>();
 
     for (const bom of boms) {
         const parent = normalizeCode(bom.parent_material_code);
-        if (!parent || !visitedParents.has(parent)) continue;
+        if (!parent) continue;
 
         const child = normalizeCode(bom.material_code);
         if (!child) continue;
@@ -768,16 +800,18 @@ function buildSupplierDetailPanelModel(
     materials: Set<string>,
     depthByCode: Map<string, number>,
     visitedParents: Set<string>,
-    boms: BOMInfo[],
+    alternativesIndex: AlternativesIndex,
     materialMasterByCode: Map<string, MaterialInfo>,
     suppliersByMaterial: SuppliersByMaterialIndex,
     supplierMatch?: SupplierMatchResult
 ): SupplierDetailPanelModel {
-    const { byParentAndGroup, fallbackAlternativesByParent, mainsByParent } = buildAlternativesIndex(boms, visitedParents);
+    const { byParentAndGroup, fallbackAlternativesByParent, mainsByParent } = alternativesIndex;
 
     const alternativeCodesByMainMaterial = new Map<string, Set<string>>();
     const approximateAlternativeAssociation = new Set<string>();
-    for (const [, groupMap] of byParentAndGroup.entries()) {
+    // 只取当前产品BOM展开涉及的父项（保持原BOM行顺序）
+    for (const [parent, groupMap] of byParentAndGroup.entries()) {
+        if (!visitedParents.has(parent)) continue;
         for (const [, groupEntry] of groupMap.entries()) {
             for (const mainCode of groupEntry.mains) {
                 const set = alternativeCodesByMainMaterial.get(mainCode) ?? new Set<string>();
@@ -789,6 +823,7 @@ function buildSupplierDetailPanelModel(
 
     // Fallback: if alternative_group is missing, show all alternatives under the same parent_code for every main under that parent_code.
     for (const [parent, altSet] of fallbackAlternativesByParent.entries()) {
+        if (!visitedParents.has(parent)) continue;
         const mains = mainsByParent.get(parent);
         if (!mains || mains.size === 0) continue;
         for (const mainCode of mains) {
@@ -1009,32 +1044,15 @@ function buildBOMDetailPanelModelFromBoms(
 export function calculateProductStockFromMaterials(
     productCode: string,
     boms: BOMInfo[],
-    inventories: InventoryInfo[]
+    inventories: InventoryInfo[],
+    stockIndex: ProductStockIndex = buildProductStockIndex(boms, inventories)
 ): { stock: number; bottleneckMaterials: string[] } {
-
-
-    // 获取该产品的BOM
-    // 根据bom_material_code过滤产品的BOM
-    const productBOMs = boms.filter(
-        bom => bom.bom_material_code === productCode
-    );
-
-
+    // 获取该产品的BOM（按 bom_material_code 索引）
+    const productBOMs = stockIndex.bomsByProduct.get(productCode) ?? [];
 
     if (productBOMs.length === 0) {
         // 如果没有BOM，尝试直接从库存中查找产品
-        const productInventories = inventories.filter(
-            inv => inv.item_code === productCode &&
-                inv.item_type === 'Product' &&
-                inv.status === 'Active'
-        );
-
-        const directStock = productInventories.reduce(
-            (sum, inv) => sum + (parseInt(inv.quantity) || 0),
-            0
-        );
-
-
+        const directStock = stockIndex.activeProductStock.get(productCode) ?? 0;
         return { stock: directStock, bottleneckMaterials: [] };
     }
 
@@ -1043,18 +1061,8 @@ export function calculateProductStockFromMaterials(
 
     // 对每个物料，计算可生产的产品数量
     for (const bom of productBOMs) {
-        // 获取该物料的库存
-        const materialInventories = inventories.filter(
-            inv => inv.item_code === bom.material_code &&
-                inv.item_type === 'Material' &&
-                inv.status === 'Active'
-        );
-
-        // 汇总该物料的总库存
-        const totalMaterialStock = materialInventories.reduce(
-            (sum, inv) => sum + (parseInt(inv.quantity) || 0),
-            0
-        );
+        // 该物料的在用库存合计
+        const totalMaterialStock = stockIndex.activeMaterialStock.get(bom.material_code) ?? 0;
 
         // 计算该物料可支持的产品数量
         const productQuantityFromThisMaterial = bom.standard_usage > 0
@@ -1433,12 +1441,13 @@ export function calculateDemandForecast(
 export async function calculateAllProductsSupplyAnalysis(): Promise<ProductSupplyAnalysis[]> {
     try {
         console.log('[智能计算] 开始加载所有数据...');
-        const [products, orders, suppliers, boms, inventories] = await Promise.all([
+        const [products, orders, suppliers, boms, inventories, materials] = await Promise.all([
             loadProductInfo(),
             loadOrderInfo(),
             loadSupplierInfo(),
             loadBOMInfo(),
             loadInventoryInfo(),
+            loadMaterialInfo(),
         ]);
 
         console.log(`[智能计算] 数据加载完成: 产品=${products.length}, 订单=${orders.length}, 供应商=${suppliers.length}, BOM=${boms.length}, 库存=${inventories.length}`);
@@ -1448,11 +1457,11 @@ export async function calculateAllProductsSupplyAnalysis(): Promise<ProductSuppl
             console.log('[智能计算] 第一个产品:', products[0]);
         }
 
-        const materials = await loadMaterialInfo();
-
         const bomChildrenByParent = buildBomChildrenIndex(boms);
         const suppliersByMaterial = buildSuppliersByMaterialIndex(suppliers);
         const materialMasterByCode = buildMaterialMasterIndex(materials);
+        const stockIndex = buildProductStockIndex(boms, inventories);
+        const alternativesIndex = buildAlternativesIndex(boms);
 
         const analyses: ProductSupplyAnalysis[] = [];
 
@@ -1465,7 +1474,7 @@ export async function calculateAllProductsSupplyAnalysis(): Promise<ProductSuppl
                 expandedMaterials,
                 depthByCode,
                 visitedParents,
-                boms,
+                alternativesIndex,
                 materialMasterByCode,
                 suppliersByMaterial,
                 supplierMatch
@@ -1478,7 +1487,8 @@ export async function calculateAllProductsSupplyAnalysis(): Promise<ProductSuppl
             const { stock: currentStock, bottleneckMaterials } = calculateProductStockFromMaterials(
                 product.product_code,
                 boms,
-                inventories
+                inventories,
+                stockIndex
             );
 
             // 计算库存状态
@@ -1573,6 +1583,8 @@ interface CachedIndices {
     bomChildrenByParent: Map<string, Set<string>>;
     suppliersByMaterial: Map<string, SupplierInfo[]>;
     materialMasterByCode: Map<string, MaterialInfo>;
+    stockIndex: ProductStockIndex;
+    alternativesIndex: AlternativesIndex;
     boms: BOMInfo[];
     inventories: InventoryInfo[];
     orders: OrderInfo[];
@@ -1608,11 +1620,15 @@ async function ensureIndicesLoaded(): Promise<CachedIndices> {
         const bomChildrenByParent = buildBomChildrenIndex(boms);
         const suppliersByMaterial = buildSuppliersByMaterialIndex(suppliers);
         const materialMasterByCode = buildMaterialMasterIndex(materials);
+        const stockIndex = buildProductStockIndex(boms, inventories);
+        const alternativesIndex = buildAlternativesIndex(boms);
 
         const indices: CachedIndices = {
             bomChildrenByParent,
             suppliersByMaterial,
             materialMasterByCode,
+            stockIndex,
+            alternativesIndex,
             boms,
             inventories,
             orders,
@@ -1647,7 +1663,7 @@ export async function calculateSingleProductAnalysis(productId: string): Promise
             return null;
         }
 
-        const { bomChildrenByParent, suppliersByMaterial, materialMasterByCode, boms, inventories, orders } = indices;
+        const { bomChildrenByParent, suppliersByMaterial, materialMasterByCode, stockIndex, alternativesIndex, boms, inventories, orders } = indices;
 
         // 计算该产品的分析
         const { materials: expandedMaterials, depthByCode, visitedParents } = expandBomMaterialsWithDepth(
@@ -1664,7 +1680,7 @@ export async function calculateSingleProductAnalysis(productId: string): Promise
             expandedMaterials,
             depthByCode,
             visitedParents,
-            boms,
+            alternativesIndex,
             materialMasterByCode,
             suppliersByMaterial,
             supplierMatch
@@ -1677,7 +1693,8 @@ export async function calculateSingleProductAnalysis(productId: string): Promise
         const { stock: currentStock, bottleneckMaterials } = calculateProductStockFromMaterials(
             product.product_code,
             boms,
-            inventories
+            inventories,
+            stockIndex
         );
 
         // 计算库存状态
@@ -19,25 +19,33 @@ export function parseSubstitutionRelations(
 ): SubstitutionRelation[] {
     const relations: SubstitutionRelation[] = [];
 
-    // 步骤 1: 按 alternative_group 分组
-    const groupedByAltGroup = new Map<string, BOMData[]>();
+    // 步骤 1: 按 parent_code + alternative_group 分组
+    // 用 父件 -> 替代组 的两级 Map 查找，避免每行拼接字符串键；groups 保留分组出现顺序
+    const groupIndex = new Map<string, Map<string, BOMData[]>>();
+    const groups: BOMData[][] = [];
 
     for (const row of bomData) {
         // 只处理有 alternative_group 的行
         if (row.alternativeGroup && row.alternativeGroup.trim() !== '') {
-            // 使用 parent_code + alternative_group 作为唯一键
-            const groupKey = `${row.parentCode}_${row.alternativeGroup}`;
+            let groupsOfParent = groupIndex.get(row.parentCode);
+            if (!groupsOfParent) {
+                groupsOfParent = new Map();
+                groupIndex.set(row.parentCode, groupsOfParent);
+            }
 
-            if (!groupedByAltGroup.has(groupKey)) {
-                groupedByAltGroup.set(groupKey, []);
+            let group = groupsOfParent.get(row.alternativeGroup);
+            if (!group) {
+                group = [];
+                groupsOfParent.set(row.alternativeGroup, group);
+                groups.push(group);
             }
 
-            groupedByAltGroup.get(groupKey)!.push(row);
+            group.push(row);
         }
     }
 
     // 步骤 2: 识别主料和替代料
-    for (const [groupKey, rows] of groupedByAltGroup) {
+    for (const rows of groups) {
         // 找到主料（alternative_part 为空）
         const primary = rows.find(r => !r.alternativePart || r.alternativePart.trim() === '');
 